@@ -3,16 +3,51 @@ Animation Manager module for Baby Games
 Handles shape animations and special effects.
 """
 
-import pygame
-import random
+import math
+import numpy as np
+from particle_renderer import ParticleRenderer
+
+# Effect types, indexed by the values stored in AnimationManager.effect
+EFFECT_TYPES = ("explosion", "sparkle", "glow")
 
 
 class AnimationManager:
-    def __init__(self):
-        """Initialize the animation manager."""
+    def __init__(self, capacity=2048, seed=None, budget=None):
+        """Initialize the animation manager.
+
+        Effect particles live in one fixed-capacity pool of NumPy arrays.
+        Free slots are kept on a stack, so spawning and reaping never
+        allocate and a full pool simply drops new particles. With an
+        EntityBudget, spawns are also trimmed to its 'effects' limit.
+        """
         self.animations = []
-        self.particle_systems = []
-        
+        self.rng = np.random.default_rng(seed)
+        self.renderer = ParticleRenderer()
+
+        # Particle pool
+        self.capacity = capacity
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.prev_x = np.zeros(capacity)  # Position before the last step
+        self.prev_y = np.zeros(capacity)
+        self.vx = np.zeros(capacity)
+        self.vy = np.zeros(capacity)
+        self.life = np.zeros(capacity, dtype=np.int32)
+        self.max_life = np.ones(capacity, dtype=np.int32)
+        self.size = np.zeros(capacity, dtype=np.int32)
+        self.color = np.zeros((capacity, 3), dtype=np.uint8)
+        self.effect = np.zeros(capacity, dtype=np.int8)
+        self.active = np.zeros(capacity, dtype=bool)
+
+        # Free list: the first free_count entries are unused slot indices
+        self.free_slots = np.arange(capacity - 1, -1, -1, dtype=np.int32)
+        self.free_count = capacity
+        self.peak_count = 0
+        self.budget = budget
+        if budget is not None:
+            budget.track('effects', self.get_particle_count)
+        self._dead = np.zeros(capacity, dtype=bool)
+
     def add_shape(self, shape):
         """Add a shape to be animated."""
         # Add some special effects based on shape type
@@ -22,111 +57,137 @@ class AnimationManager:
             self.create_sparkle_effect(shape.x, shape.y, shape.color)
         elif shape.shape_type in ["rainbow", "sun", "moon"]:
             self.create_glow_effect(shape.x, shape.y, shape.color)
-    
+
+    def _spawn(self, effect, x, y, vx, vy, life, color, size):
+        """Take slots from the free list and fill them with new particles."""
+        n = min(len(x), self.free_count)
+        if self.budget is not None:
+            n, _ = self.budget.admit('effects', n)
+        if n == 0:
+            return
+
+        self.free_count -= n
+        slots = self.free_slots[self.free_count:self.free_count + n]
+
+        self.x[slots] = x[:n]
+        self.y[slots] = y[:n]
+        self.prev_x[slots] = x[:n]
+        self.prev_y[slots] = y[:n]
+        self.vx[slots] = vx[:n]
+        self.vy[slots] = vy[:n]
+        self.life[slots] = life
+        self.max_life[slots] = life
+        self.size[slots] = size[:n]
+        self.color[slots] = color
+        self.effect[slots] = EFFECT_TYPES.index(effect)
+        self.active[slots] = True
+        self.peak_count = max(self.peak_count, self.capacity - self.free_count)
+
     def create_explosion_effect(self, x, y, color):
         """Create an explosion particle effect."""
-        particles = []
-        for i in range(20):
-            particle = {
-                'x': x,
-                'y': y,
-                'vx': random.uniform(-8, 8),
-                'vy': random.uniform(-8, 8),
-                'life': 60,
-                'max_life': 60,
-                'color': color,
-                'size': random.randint(2, 6)
-            }
-            particles.append(particle)
-        
-        self.particle_systems.append({
-            'particles': particles,
-            'type': 'explosion'
-        })
-    
+        rng = self.rng
+        count = 20
+        self._spawn('explosion',
+                    np.full(count, x, dtype=float),
+                    np.full(count, y, dtype=float),
+                    rng.uniform(-8, 8, count),
+                    rng.uniform(-8, 8, count),
+                    60, color,
+                    rng.integers(2, 7, count))
+
     def create_sparkle_effect(self, x, y, color):
         """Create a sparkle effect."""
-        particles = []
-        for i in range(10):
-            particle = {
-                'x': x + random.randint(-20, 20),
-                'y': y + random.randint(-20, 20),
-                'vx': random.uniform(-2, 2),
-                'vy': random.uniform(-2, 2),
-                'life': 30,
-                'max_life': 30,
-                'color': color,
-                'size': random.randint(1, 3)
-            }
-            particles.append(particle)
-        
-        self.particle_systems.append({
-            'particles': particles,
-            'type': 'sparkle'
-        })
-    
+        rng = self.rng
+        count = 10
+        self._spawn('sparkle',
+                    x + rng.integers(-20, 21, count),
+                    y + rng.integers(-20, 21, count),
+                    rng.uniform(-2, 2, count),
+                    rng.uniform(-2, 2, count),
+                    30, color,
+                    rng.integers(1, 4, count))
+
     def create_glow_effect(self, x, y, color):
         """Create a glow effect around shapes."""
-        particles = []
-        for i in range(8):
-            angle = i * (2 * 3.14159 / 8)
-            particle = {
-                'x': x + 30 * pygame.math.Vector2(1, 0).rotate(angle * 180 / 3.14159)[0],
-                'y': y + 30 * pygame.math.Vector2(1, 0).rotate(angle * 180 / 3.14159)[1],
-                'vx': 0,
-                'vy': 0,
-                'life': 45,
-                'max_life': 45,
-                'color': color,
-                'size': random.randint(3, 8)
-            }
-            particles.append(particle)
-        
-        self.particle_systems.append({
-            'particles': particles,
-            'type': 'glow'
-        })
-    
+        count = 8
+        angles = np.arange(count) * (2 * math.pi / count)
+        self._spawn('glow',
+                    x + 30 * np.cos(angles),
+                    y + 30 * np.sin(angles),
+                    np.zeros(count),
+                    np.zeros(count),
+                    45, color,
+                    self.rng.integers(3, 9, count))
+
     def update(self):
-        """Update all animations and particle systems."""
-        # Update particle systems
-        for system in self.particle_systems[:]:
-            for particle in system['particles'][:]:
-                # Update position
-                particle['x'] += particle['vx']
-                particle['y'] += particle['vy']
-                
-                # Update life
-                particle['life'] -= 1
-                
-                # Remove dead particles
-                if particle['life'] <= 0:
-                    system['particles'].remove(particle)
-            
-            # Remove empty particle systems
-            if not system['particles']:
-                self.particle_systems.remove(system)
-    
-    def draw_particles(self, screen):
-        """Draw all particle effects."""
-        for system in self.particle_systems:
-            for particle in system['particles']:
-                # Calculate alpha based on life
-                alpha = int((particle['life'] / particle['max_life']) * 255)
-                
-                # Create color with alpha
-                color_with_alpha = (*particle['color'], alpha)
-                
-                # Create surface for particle
-                particle_surface = pygame.Surface((particle['size'] * 2, particle['size'] * 2), pygame.SRCALPHA)
-                pygame.draw.circle(particle_surface, color_with_alpha, 
-                                 (particle['size'], particle['size']), particle['size'])
-                
-                # Draw to screen
-                screen.blit(particle_surface, 
-                           (particle['x'] - particle['size'], particle['y'] - particle['size']))
-    
+        """Advance all effect particles by one simulation step."""
+        if self.free_count == self.capacity:
+            return
+
+        active = self.active
+
+        # Update position and life of live slots only
+        np.copyto(self.prev_x, self.x, where=active)
+        np.copyto(self.prev_y, self.y, where=active)
+        np.add(self.x, self.vx, out=self.x, where=active)
+        np.add(self.y, self.vy, out=self.y, where=active)
+        np.subtract(self.life, 1, out=self.life, where=active)
+
+        # Return dead particles to the free list
+        np.less_equal(self.life, 0, out=self._dead)
+        np.logical_and(self._dead, active, out=self._dead)
+        if self._dead.any():
+            dead = np.flatnonzero(self._dead)
+            active[dead] = False
+            self.free_slots[self.free_count:self.free_count + len(dead)] = dead
+            self.free_count += len(dead)
+
+    def draw_particles(self, screen, alpha=1.0):
+        """Draw all particle effects and return the screen rects they cover.
+
+        alpha interpolates positions between the previous simulation step
+        (0.0) and the current one (1.0).
+        """
+        if self.free_count == self.capacity:
+            return self.renderer.flush(screen)
+
+        slots = np.flatnonzero(self.active)
+        prev_x = self.prev_x[slots]
+        prev_y = self.prev_y[slots]
+        xs = (prev_x + (self.x[slots] - prev_x) * alpha).astype(int).tolist()
+        ys = (prev_y + (self.y[slots] - prev_y) * alpha).astype(int).tolist()
+        sizes = self.size[slots].tolist()
+        colors = self.color[slots].tolist()
+        alphas = (self.life[slots] * 255 // self.max_life[slots]).tolist()
+
+        add = self.renderer.add
+        for x, y, size, color, alpha in zip(xs, ys, sizes, colors, alphas):
+            add("circle", tuple(color), size, x, y, alpha)
+
+        return self.renderer.flush(screen)
+
+    def copy_from(self, other):
+        """Make this manager a copy of another's effect particles, e.g. for a snapshot."""
+        for name in ('x', 'y', 'prev_x', 'prev_y', 'life', 'max_life', 'size', 'color', 'active'):
+            np.copyto(getattr(self, name), getattr(other, name))
+        self.free_count = other.free_count
+
+    def get_render_stats(self):
+        """Get blit and surface allocation counts for the last draw."""
+        return self.renderer.get_stats()
+
+    def get_pool_stats(self):
+        """Get particle pool use, including the high-water mark."""
+        return {'in_use': self.get_particle_count(), 'capacity': self.capacity,
+                'peak_in_use': self.peak_count}
+
+    def get_particle_count(self):
+        """Get the current number of effect particles."""
+        return self.capacity - self.free_count
+
     def clear_all(self):
         """Clear all animations and particle systems."""
         self.animations.clear()
-        self.particle_systems.clear()
\ No newline at end of file
+        self.active[:] = False
+        self.free_slots[:] = np.arange(self.capacity - 1, -1, -1, dtype=np.int32)
+        self.free_count = self.capacity
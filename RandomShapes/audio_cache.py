@@ -0,0 +1,87 @@
+"""
+Audio Cache module for Baby Games
+Stores synthesized sound buffers on disk so later launches can skip synthesis.
+"""
+
+import os
+import glob
+import json
+import hashlib
+import numpy as np
+from game_log import logger
+
+# Bump when the synthesis code changes in a way the tone parameters don't show
+CACHE_VERSION = 1
+
+
+def default_cache_dir():
+    """Get the default sound cache directory."""
+    if os.environ.get("BABYGAMES_CACHE_DIR"):
+        return os.path.join(os.environ["BABYGAMES_CACHE_DIR"], "sounds")
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "babygames", "sounds")
+
+
+class AudioCache:
+    def __init__(self, directory=None):
+        """Initialize the audio cache.
+
+        Each sound is a raw int16 file named <name>-<hash>.pcm, where the hash
+        covers everything that affects the samples, so changed parameters
+        simply miss and the stale file is removed on the next store.
+        """
+        self.directory = directory or default_cache_dir()
+        self.hits = 0
+        self.misses = 0
+
+    def make_key(self, tone, sample_rate, duration, mixer_format):
+        """Hash the tone parameters, sample rate and mixer format."""
+        description = json.dumps({
+            'version': CACHE_VERSION,
+            'tone': tone,
+            'sample_rate': sample_rate,
+            'duration': duration,
+            'mixer_format': list(mixer_format),
+        }, sort_keys=True)
+        return hashlib.sha256(description.encode("utf-8")).hexdigest()[:16]
+
+    def path_for(self, name, key):
+        """Get the file path for a cached sound."""
+        return os.path.join(self.directory, f"{name}-{key}.pcm")
+
+    def load(self, name, key, channels):
+        """Memory-map a cached sound, or return None if it isn't cached."""
+        path = self.path_for(name, key)
+        try:
+            samples = np.memmap(path, dtype=np.int16, mode="r")
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+
+        if len(samples) == 0 or len(samples) % channels:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return samples if channels == 1 else samples.reshape(-1, channels)
+
+    def store(self, name, key, samples):
+        """Write a sound to the cache and remove older versions of it."""
+        path = self.path_for(name, key)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(temp_path, "wb") as f:
+                f.write(np.ascontiguousarray(samples, dtype=np.int16).tobytes())
+            os.replace(temp_path, path)
+        except OSError as e:
+            logger.warning("⚠️  Could not write sound cache %s: %s", path, e)
+            return
+
+        # Drop entries for the same sound made with old parameters
+        for stale_path in glob.glob(os.path.join(self.directory, f"{name}-*.pcm")):
+            if stale_path != path:
+                try:
+                    os.remove(stale_path)
+                except OSError:
+                    pass
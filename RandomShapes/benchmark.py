@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+Benchmark harness for Baby Games
+Runs the real game loop headless with scripted input and reports frame timings as JSON.
+
+Usage:
+    python benchmark.py                       # all scenarios
+    python benchmark.py --scenario key_repeat_storm --frames 1200
+    python benchmark.py --output before.json
+    python benchmark.py --spatial             # spatial index scaling only
+"""
+
+import os
+
+# Headless drivers must be chosen before pygame initializes
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import sys
+import io
+import gc
+import json
+import math
+import time
+import random
+import argparse
+import contextlib
+import pygame
+from main import BabyGame
+from shapes import sprite_cache
+from spatial_hash import SpatialHash
+
+FRAME_MS = 1000 / 60
+
+# Stages of BabyGame.run_frame, as (owner attribute, method name)
+SUBSYSTEMS = [
+    ("events", None, None),
+    ("animation_update", "animation_manager", "update"),
+    ("shape_update", "shape_manager", "update"),
+    ("tail_update", "shape_manager", "update_mouse_tail"),
+    ("clear", "display", "clear"),
+    ("shape_draw", "shape_manager", "draw"),
+    ("tail_draw", "shape_manager", "draw_mouse_tail"),
+    ("effect_draw", "animation_manager", "draw_particles"),
+    ("present", "display", "update"),
+]
+
+
+def key_event(key):
+    """Make a scripted key press."""
+    return pygame.event.Event(pygame.KEYDOWN, key=key, mod=0, unicode="", scancode=0)
+
+
+def click_event(button, pos):
+    """Make a scripted mouse button press."""
+    return pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=button, pos=pos)
+
+
+def steady_typing(frame, rng, width, height):
+    """A child pressing a letter or number about four times a second."""
+    events = []
+    if frame % 15 == 0:
+        keys = list(range(pygame.K_a, pygame.K_z + 1)) + list(range(pygame.K_0, pygame.K_9 + 1))
+        events.append(key_event(rng.choice(keys)))
+    return events, (width // 2, height // 2)
+
+
+def key_repeat_storm(frame, rng, width, height):
+    """Keys held down and auto-repeating, including the explosion keys."""
+    events = []
+    if frame % 2 == 0:
+        events.append(key_event(rng.choice([pygame.K_SPACE, pygame.K_RETURN, pygame.K_0])))
+    if frame % 3 == 0:
+        events.append(key_event(rng.randint(pygame.K_a, pygame.K_z)))
+    return events, (width // 2, height // 2)
+
+
+def cosmic_portal_spam(frame, rng, width, height):
+    """Side button 4 mashed all over the screen."""
+    events = []
+    if frame % 10 == 0:
+        pos = (rng.randint(100, width - 100), rng.randint(100, height - 100))
+        events.append(click_event(7, pos))
+    return events, (width // 2, height // 2)
+
+
+def mouse_mash(frame, rng, width, height):
+    """Every mouse button mashed at once, several clicks a frame."""
+    events = []
+    for _ in range(3):
+        pos = (rng.randint(0, width - 1), rng.randint(0, height - 1))
+        events.append(click_event(rng.randint(1, 7), pos))
+    return events, pos
+
+
+def mouse_circling(frame, rng, width, height):
+    """The mouse swept in circles with the occasional click."""
+    angle = frame * 0.08
+    pos = (int(width / 2 + width / 3 * math.cos(angle)),
+           int(height / 2 + height / 3 * math.sin(angle)))
+    events = []
+    if frame % 45 == 0:
+        events.append(click_event(rng.randint(1, 7), pos))
+    return events, pos
+
+
+SCENARIOS = {
+    "steady_typing": steady_typing,
+    "key_repeat_storm": key_repeat_storm,
+    "cosmic_portal_spam": cosmic_portal_spam,
+    "mouse_circling": mouse_circling,
+    "mouse_mash": mouse_mash,
+}
+
+
+def percentiles(values):
+    """Summarize a list of millisecond timings."""
+    if not values:
+        return {}
+    ordered = sorted(values)
+
+    def pick(fraction):
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    return {
+        "mean": round(sum(ordered) / len(ordered), 3),
+        "p50": round(pick(0.50), 3),
+        "p95": round(pick(0.95), 3),
+        "p99": round(pick(0.99), 3),
+        "max": round(ordered[-1], 3),
+    }
+
+
+def timed(method, samples):
+    """Wrap a bound method so each call's duration is added to samples[-1]."""
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            samples[-1] += (time.perf_counter() - start) * 1000
+    return wrapper
+
+
+def run_scenario(name, frames, seed, game_options=None):
+    """Run one scenario and return its measurements."""
+    script = SCENARIOS[name]
+    rng = random.Random(seed)
+    sprite_cache.clear()
+    sprite_cache.reset_stats()  # So earlier scenarios don't show in this one's stats
+
+    # Keep any game output out of the report
+    with contextlib.redirect_stdout(io.StringIO()):
+        game = BabyGame(seed=seed, **(game_options or {}))
+        game.shape_manager.sound_manager.wait_until_ready(timeout=10)
+    width, height = game.display.get_screen_bounds()
+
+    # Instrument each subsystem of the real game loop
+    subsystem_samples = {stage: [] for stage, _, _ in SUBSYSTEMS}
+    for stage, owner, method_name in SUBSYSTEMS:
+        if owner is not None:
+            target = getattr(game, owner)
+            setattr(target, method_name, timed(getattr(target, method_name), subsystem_samples[stage]))
+    for method_name in ("handle_key_press", "handle_mouse_click"):
+        setattr(game, method_name, timed(getattr(game, method_name), subsystem_samples["events"]))
+
+    frame_times = []
+    alloc_blocks = []
+    gc_collections = 0
+    peak_shapes = 0
+    peak_particles = 0
+    misses_before = sprite_cache.misses
+    renderers = {
+        "particle_sprites": game.shape_manager.particle_system,
+        "effect_sprites": game.animation_manager,
+    }
+    renderer_allocations_before = {name: owner.get_render_stats()['total_allocations']
+                                   for name, owner in renderers.items()}
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        pygame.event.clear()
+        for frame in range(frames):
+            events, mouse_pos = script(frame, rng, width, height)
+            for event in events:
+                pygame.event.post(event)
+            for samples in subsystem_samples.values():
+                samples.append(0.0)
+
+            gc_before = sum(stat["collections"] for stat in gc.get_stats())
+            blocks_before = sys.getallocatedblocks()
+            start = time.perf_counter()
+            game.run_frame(FRAME_MS, mouse_pos)
+            frame_times.append((time.perf_counter() - start) * 1000)
+            alloc_blocks.append(sys.getallocatedblocks() - blocks_before)
+            gc_collections += sum(stat["collections"] for stat in gc.get_stats()) - gc_before
+
+            peak_shapes = max(peak_shapes, game.shape_manager.get_shape_count())
+            peak_particles = max(peak_particles,
+                                 game.shape_manager.get_particle_count()
+                                 + game.animation_manager.get_particle_count())
+
+        game.shape_manager.cleanup()
+
+    # Surfaces made by the shape sprite cache and both particle renderers
+    sprite_allocations = {"shape_sprites": sprite_cache.misses - misses_before}
+    for name, owner in renderers.items():
+        sprite_allocations[name] = (owner.get_render_stats()['total_allocations']
+                                    - renderer_allocations_before[name])
+
+    return {
+        "frames": frames,
+        "seed": seed,
+        "frame_ms": percentiles(frame_times),
+        "subsystem_ms": {stage: percentiles(samples) for stage, samples in subsystem_samples.items()},
+        "allocations_per_frame": {
+            "net_python_blocks": round(sum(alloc_blocks) / frames, 1),
+            "sprite_surfaces": round(sum(sprite_allocations.values()) / frames, 3),
+            **{name: round(count / frames, 3) for name, count in sprite_allocations.items()},
+            "gc_collections": round(gc_collections / frames, 3),
+        },
+        "peak_shapes": peak_shapes,
+        "peak_particles": peak_particles,
+        "sprite_cache": sprite_cache.get_stats(),
+        "budget": game.budget.get_stats(),
+        "pools": dict(game.shape_manager.get_pool_stats(),
+                      effects=game.animation_manager.get_pool_stats()),
+    }
+
+
+def naive_overlapping_pairs(bodies):
+    """Check every pair of circles, for comparison with the spatial index."""
+    pairs = []
+    for i in range(len(bodies) - 1):
+        ax, ay, a_radius = bodies[i][:3]
+        for j in range(i + 1, len(bodies)):
+            bx, by, b_radius = bodies[j][:3]
+            reach = a_radius + b_radius
+            if (bx - ax) ** 2 + (by - ay) ** 2 <= reach * reach:
+                pairs.append((i, j))
+    return pairs
+
+
+def run_spatial_benchmark(counts, seed, steps=20, naive_limit=2000):
+    """Time the spatial index against pairwise checks as the shape count grows.
+
+    Shapes are spread at a constant density (about 50 per 1920x1080 screen)
+    so the work per shape should stay flat as the count grows.
+    """
+    results = {}
+    for count in counts:
+        rng = random.Random(seed)
+        side = math.sqrt(count / 50 * 1920 * 1080)
+        bodies = [[rng.uniform(0, side), rng.uniform(0, side), rng.uniform(15, 100),
+                   rng.uniform(-3, 3), rng.uniform(-3, 3)] for _ in range(count)]
+        index = SpatialHash(cell_size=128)
+
+        update_ms, pairs_ms, point_ms, naive_ms = [], [], [], []
+        pair_count = 0
+        for _ in range(steps):
+            start = time.perf_counter()
+            for i, body in enumerate(bodies):
+                body[0] += body[3]
+                body[1] += body[4]
+                index.update(i, body[0], body[1], body[2])
+            update_ms.append((time.perf_counter() - start) * 1000)
+
+            start = time.perf_counter()
+            pair_count = len(index.overlapping_pairs())
+            pairs_ms.append((time.perf_counter() - start) * 1000)
+
+            start = time.perf_counter()
+            for _ in range(100):
+                index.query_point(rng.uniform(0, side), rng.uniform(0, side))
+            point_ms.append((time.perf_counter() - start) * 10)  # per query
+
+            if count <= naive_limit:
+                start = time.perf_counter()
+                naive_overlapping_pairs(bodies)
+                naive_ms.append((time.perf_counter() - start) * 1000)
+
+        results[str(count)] = {
+            "update_ms": percentiles(update_ms),
+            "pairs_ms": percentiles(pairs_ms),
+            "point_query_ms": percentiles(point_ms),
+            "naive_pairs_ms": percentiles(naive_ms) if naive_ms else None,
+            "overlapping_pairs": pair_count,
+            "us_per_shape": round((sum(update_ms) + sum(pairs_ms)) / steps / count * 1000, 3),
+            "index": index.get_stats(),
+        }
+    return results
+
+
+def parse_args(argv=None):
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description="Headless Baby Games benchmark")
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS) + ["all"], default="all",
+                        help="scenario to run (default: all)")
+    parser.add_argument("--frames", type=int, default=600,
+                        help="frames to simulate per scenario (default: 600)")
+    parser.add_argument("--seed", type=int, default=1,
+                        help="seed for the game and the input script (default: 1)")
+    parser.add_argument("--dirty-rects", action="store_true",
+                        help="benchmark the dirty-rect display mode")
+    parser.add_argument("--spatial", action="store_true",
+                        help="only benchmark the spatial index from 100 to 10000 shapes")
+    parser.add_argument("--output", help="write the JSON report to this file instead of stdout")
+    return parser.parse_args(argv)
+
+
+def main():
+    """Run the requested scenarios and print a JSON report."""
+    args = parse_args()
+    names = sorted(SCENARIOS) if args.scenario == "all" else [args.scenario]
+    game_options = {"dirty_rects": args.dirty_rects}
+
+    report = {
+        "pygame": pygame.version.ver,
+        "python": sys.version.split()[0],
+        "video_driver": os.environ["SDL_VIDEODRIVER"],
+    }
+    if args.spatial:
+        report["spatial_index"] = run_spatial_benchmark([100, 500, 1000, 2000, 5000, 10000], args.seed)
+    else:
+        report["scenarios"] = {name: run_scenario(name, args.frames, args.seed, game_options)
+                               for name in names}
+    pygame.quit()
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,36 +4,98 @@ Handles full-screen window creation and rendering.
 """
 
 import pygame
+from game_log import logger
+from render_backend import TextureScreen
 
 
 class Display:
-    def __init__(self):
-        """Initialize the full-screen display."""
-        # Get display info
-        info = pygame.display.Info()
-        self.width = info.current_w
-        self.height = info.current_h
-        
-        # Set up full-screen display
-        self.screen = pygame.display.set_mode((self.width, self.height), pygame.FULLSCREEN)
+    def __init__(self, dirty_rects=False, full_update_fraction=0.5, size=None, backend="surface"):
+        """Initialize the full-screen display.
+        
+        In dirty-rect mode only the areas drawn this frame and last frame are
+        erased and presented, unless they cover more than
+        full_update_fraction of the screen. Passing size opens a window of
+        that size instead, e.g. to replay a session recorded on another screen.
+        backend "texture" draws through SDL's renderer with a TextureScreen in
+        place of the display surface; it always redraws the whole screen.
+        """
+        self.backend = backend
+        if backend == "texture":
+            fullscreen = size is None
+            if fullscreen:
+                info = pygame.display.Info()
+                size = (info.current_w, info.current_h)
+            self.width, self.height = size
+            self.screen = TextureScreen(size, fullscreen=fullscreen,
+                                        title="Baby Games - Press any key!")
+            dirty_rects = False
+        elif size is not None:
+            self.width, self.height = size
+            self.screen = pygame.display.set_mode((self.width, self.height))
+        else:
+            # Get display info
+            info = pygame.display.Info()
+            self.width = info.current_w
+            self.height = info.current_h
+            
+            # Set up full-screen display
+            self.screen = pygame.display.set_mode((self.width, self.height), pygame.FULLSCREEN)
         pygame.display.set_caption("Baby Games - Press any key!")
         
         # Set up colors
         self.BLACK = (0, 0, 0)
         self.WHITE = (255, 255, 255)
         
+        # Dirty-rect rendering
+        self.dirty_rects = dirty_rects
+        self.full_update_fraction = full_update_fraction
+        self.previous_rects = None  # None forces a full clear and flip
+        
         # Hide mouse cursor for full immersion
         pygame.mouse.set_visible(False)
         
-        print(f"🖥️  Full-screen display initialized: {self.width}x{self.height}")
+        logger.info("🖥️  Full-screen display initialized: %dx%d", self.width, self.height)
     
     def clear(self):
         """Clear the screen with black background."""
-        self.screen.fill(self.BLACK)
+        if self.dirty_rects and self.previous_rects is not None:
+            # Only erase what was drawn last frame
+            for rect in self.previous_rects:
+                self.screen.fill(self.BLACK, rect)
+        else:
+            self.screen.fill(self.BLACK)
     
-    def update(self):
-        """Update the display."""
-        pygame.display.flip()
+    def update(self, rects=None):
+        """Update the display.
+        
+        rects are the screen areas drawn this frame; they are only used in
+        dirty-rect mode.
+        """
+        if self.backend == "texture":
+            self.screen.present()
+            return
+        
+        if not self.dirty_rects or rects is None:
+            pygame.display.flip()
+            self.previous_rects = None
+            return
+        
+        screen_rect = self.screen.get_rect()
+        current_rects = [screen_rect.clip(rect) for rect in rects]
+        current_rects = [rect for rect in current_rects if rect.width and rect.height]
+        
+        if self.previous_rects is None:
+            pygame.display.flip()
+        else:
+            # Present last frame's areas (now erased) and this frame's drawing
+            update_rects = self.previous_rects + current_rects
+            dirty_area = sum(rect.width * rect.height for rect in update_rects)
+            if dirty_area > self.full_update_fraction * self.width * self.height:
+                pygame.display.flip()
+            else:
+                pygame.display.update(update_rects)
+        
+        self.previous_rects = current_rects
     
     def get_center(self):
         """Get the center point of the screen."""
@@ -0,0 +1,87 @@
+"""
+Entity Budget module for Baby Games
+Caps how many shapes and particles can be alive at once, so no amount of
+key or mouse mashing can make a frame arbitrarily slow.
+"""
+
+# Spawn priorities; higher priorities may evict lower ones to make room
+PRIORITY_EFFECT = 0  # Shapes from mouse effects
+PRIORITY_KEY = 1     # Shapes from key presses
+
+KINDS = ("shapes", "particles", "effects")
+
+
+class EntityBudget:
+    def __init__(self, shapes=120, particles=1500, effects=2048):
+        """Initialize the budget with the most live entities of each kind.
+
+        shapes covers every on-screen shape, particles the pop particles and
+        effects the animation manager's effect particles.
+        """
+        self.base_limits = {'shapes': shapes, 'particles': particles, 'effects': effects}
+        for kind, limit in self.base_limits.items():
+            if limit < 0:
+                raise ValueError(f"The {kind} budget can't be negative, got {limit}")
+        self.limits = dict(self.base_limits)
+        self.counters = {}
+
+        # Statistics
+        self.requested = dict.fromkeys(KINDS, 0)
+        self.shed = dict.fromkeys(KINDS, 0)
+        self.evicted = dict.fromkeys(KINDS, 0)
+
+    def track(self, kind, count):
+        """Register the function that returns the live count of a kind."""
+        self.counters[kind] = count
+
+    def set_limit_scale(self, kind, scale):
+        """Scale a kind's limit relative to the one it was created with.
+
+        Lowering a limit never removes live entities; it only stops new
+        ones from being admitted until the count drops below it.
+        """
+        self.limits[kind] = max(1, int(self.base_limits[kind] * scale))
+
+    def get_count(self, kind):
+        """Get the live count of a kind."""
+        count = self.counters.get(kind)
+        return count() if count is not None else 0
+
+    def admit(self, kind, requested, evictable=0):
+        """Decide how much of a spawn fits.
+
+        Returns (admitted, evict): how many entities may be created and how
+        many of the evictable existing ones the caller must remove first.
+        Whatever still doesn't fit is shed.
+        """
+        free = max(0, self.limits[kind] - self.get_count(kind))
+        evict = min(max(0, requested - free), evictable)
+        admitted = min(requested, free + evict)
+
+        self.requested[kind] += requested
+        self.shed[kind] += requested - admitted
+        self.evicted[kind] += evict
+        return admitted, evict
+
+    def get_pressure(self, kind=None):
+        """Get how full the budget is, from 0.0 to 1.0, for one kind or the fullest."""
+        if kind is not None:
+            limit = self.limits[kind]
+            if limit <= 0:
+                return 1.0  # Nothing of this kind is allowed
+            return min(1.0, self.get_count(kind) / limit)
+        return max(self.get_pressure(kind) for kind in KINDS)
+
+    def get_stats(self):
+        """Get live counts, limits, pressure and shed/evicted totals."""
+        return {
+            kind: {
+                'live': self.get_count(kind),
+                'limit': self.limits[kind],
+                'pressure': round(self.get_pressure(kind), 3),
+                'requested': self.requested[kind],
+                'shed': self.shed[kind],
+                'evicted': self.evicted[kind],
+            }
+            for kind in KINDS
+        }
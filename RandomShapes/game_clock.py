@@ -0,0 +1,26 @@
+"""
+Game Clock module for Baby Games
+Keeps the game time used for shape lifetimes and animations.
+
+Game time only moves when the main loop advances it, so headless runs can
+simulate frames faster (or slower) than real time and still behave the same.
+"""
+
+_ticks = 0.0
+
+
+def get_ticks():
+    """Get the game time in milliseconds."""
+    return int(_ticks)
+
+
+def advance(dt):
+    """Move the game time forward by dt milliseconds."""
+    global _ticks
+    _ticks += dt
+
+
+def reset(ticks=0):
+    """Set the game time, e.g. before starting a new run."""
+    global _ticks
+    _ticks = float(ticks)
@@ -0,0 +1,77 @@
+"""
+Game Log module for Baby Games
+Leveled logging that never blocks the game loop on output.
+
+Records go through a queue to a background thread that does the writing,
+so a slow stdout (a pipe to journald, a terminal being scrolled) can't
+stall a frame. Chatty per-shape events are tallied and written once per
+frame, e.g. 48 spiral shapes from one click become a single line.
+"""
+
+import logging
+import logging.handlers
+import queue
+import sys
+
+logger = logging.getLogger("babygames")
+
+LEVELS = {
+    "debug": logging.DEBUG,
+    "info": logging.INFO,
+    "warning": logging.WARNING,
+    "error": logging.ERROR,
+}
+
+_listener = None
+_tallies = {}  # (level, message, args) -> times seen this frame
+
+
+def setup(level=logging.INFO, stream=None):
+    """Send game log records at level or above to stream via a writer thread."""
+    global _listener
+    shutdown()
+
+    records = queue.SimpleQueue()
+    handler = logging.StreamHandler(stream if stream is not None else sys.stdout)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    _listener = logging.handlers.QueueListener(records, handler)
+    _listener.start()
+
+    logger.handlers = [logging.handlers.QueueHandler(records)]
+    logger.setLevel(level)
+    logger.propagate = False
+
+
+def shutdown():
+    """Write out everything still queued and stop the writer thread."""
+    global _listener
+    end_frame()
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+        logger.handlers = []
+
+
+def tally(level, message, *args):
+    """Count an event to be logged once at the end of the frame.
+
+    Identical events in one frame become one record with a count, so
+    callers can report every shape without flooding the log.
+    """
+    if logger.isEnabledFor(level):
+        key = (level, message, args)
+        _tallies[key] = _tallies.get(key, 0) + 1
+
+
+def end_frame():
+    """Log this frame's tallied events, one record each."""
+    global _tallies
+    if not _tallies:
+        return
+    # Swap in a fresh dict first, so a simulation thread can keep tallying
+    tallies, _tallies = _tallies, {}
+    for (level, message, args), count in list(tallies.items()):
+        if count > 1:
+            logger.log(level, message + " (x%d)", *args, count)
+        else:
+            logger.log(level, message, *args)
@@ -0,0 +1,73 @@
+"""
+Geometry module for Baby Games
+Unit vertex tables for the shape primitives, computed once at import.
+
+Drawing code only scales and translates these tables. transform works on
+one shape or, with arrays of sizes and centers, on many shapes at once.
+"""
+
+import math
+from functools import lru_cache
+import numpy as np
+
+# Distinct layouts for the randomly scattered "dots" and "lines" shapes.
+# Shapes pick one, so the same few sprites are shared and cached.
+PATTERN_VARIANTS = 16
+
+
+def ray_directions(count, offset=0.0):
+    """Get unit vectors for count rays evenly spaced around a circle."""
+    return np.array([(math.cos(offset + i * 2 * math.pi / count),
+                      math.sin(offset + i * 2 * math.pi / count)) for i in range(count)])
+
+
+# Star: ten points alternating between the outer and inner radius
+STAR_DIRECTIONS = np.array([(math.cos(i * math.pi / 5), math.sin(i * math.pi / 5)) for i in range(10)])
+STAR_OUTER = np.arange(10) % 2 == 0
+
+# Heart: the classic sin^3 / cosine-series curve, in units of size // 16
+HEART = np.array([
+    (16 * math.sin(math.radians(t)) ** 3,
+     -(13 * math.cos(math.radians(t)) - 5 * math.cos(2 * math.radians(t))
+       - 2 * math.cos(3 * math.radians(t)) - math.cos(4 * math.radians(t))))
+    for t in range(0, 360, 5)
+])
+
+# Spiral: two turns growing from the center out to radius 1
+SPIRAL = np.array([(i / 720 * math.cos(math.radians(i)), i / 720 * math.sin(math.radians(i)))
+                   for i in range(0, 720, 10)])
+
+# Rays for the burst-like shapes
+SPARKLE_RAYS = ray_directions(4)
+BURST_RAYS = ray_directions(6)
+FLOWER_PETALS = ray_directions(6)
+FIREWORK_RAYS = ray_directions(8)
+SUN_RAYS = ray_directions(8)
+EXPLOSION_RAYS = ray_directions(12)
+
+
+def transform(vertices, scale, x, y):
+    """Scale unit vertices and move them to (x, y).
+
+    With scalars this places one shape and returns an (n, 2) array. With
+    arrays of m scales and centers it places m shapes at once and returns
+    an (m, n, 2) array.
+    """
+    scale = np.asarray(scale, dtype=float)[..., None, None]
+    center = np.stack([np.asarray(x, dtype=float), np.asarray(y, dtype=float)], axis=-1)[..., None, :]
+    return vertices * scale + center
+
+
+def star_points(size):
+    """Get the unit-centered star outline for a given outer size."""
+    radii = np.where(STAR_OUTER, size, max(1, size // 2))
+    return STAR_DIRECTIONS * radii[:, None]
+
+
+@lru_cache(maxsize=PATTERN_VARIANTS * 2)
+def scatter(pattern, count):
+    """Get count stable random points in the unit square [-1, 1] for a pattern."""
+    rng = np.random.default_rng(pattern)
+    points = rng.uniform(-1, 1, (count, 2))
+    points.flags.writeable = False
+    return points
@@ -4,44 +4,174 @@ Baby Games - Interactive Keyboard Game
 A fun game for babies to press keys and watch colorful shapes appear!
 """
 
+import os
 import sys
+import time
+import random
+import argparse
+import logging
 import pygame
+import game_clock
+import game_log
+import shapes
 from display import Display
 from input_handler import InputHandler
 from shape_manager import ShapeManager
+from sound_manager import SoundManager, MIXER_FREQUENCY, MIXER_SIZE, MIXER_CHANNELS
 from animation_manager import AnimationManager
+from session_log import SessionRecorder, SessionPlayer, SEED_NAMES
+from profiler import FrameProfiler
+from entity_budget import EntityBudget
+from game_log import logger
+from sim_thread import SimulationThread
+from render_backend import BACKENDS
+from quality_governor import QualityGovernor, QUALITY_LEVELS, QUALITY_NAMES, QUALITY_CHANGED
+
+# Frames kept for a trace export; ten minutes at 60 fps
+TRACE_FRAMES = 36000
+
+# The simulation always advances in fixed steps, whatever the frame rate
+SIMULATION_HZ = 60
+STEP_MS = 1000 / SIMULATION_HZ
+
+# Most steps run in one frame; a longer stall is dropped instead of caught up
+MAX_STEPS_PER_FRAME = 5
+
+
+def make_seeds(seed=None):
+    """Make one seed per random source, derived from seed or from the OS."""
+    source = random.Random(seed) if seed is not None else random.SystemRandom()
+    return {name: source.getrandbits(63) for name in SEED_NAMES}
 
 
 class BabyGame:
-    def __init__(self):
-        """Initialize the baby game."""
+    def __init__(self, dirty_rects=False, full_update_fraction=0.5, show_startup_timings=False,
+                 audio_buffer=512, max_voices=8, max_triggers_per_frame=2, seed=None,
+                 seeds=None, screen_size=None, record_path=None, trace_path=None, fps=60,
+                 max_shapes=10, shape_budget=120, particle_budget=1500, quality="auto",
+                 sim_thread=False, render_backend="surface"):
+        """Initialize the baby game.
+        
+        seed makes shape placement and particle effects repeatable; seeds
+        sets each random source directly, as a replayed session does.
+        record_path records the session to a log for replay_session, and
+        trace_path writes the profiler's Chrome trace there on cleanup.
+        fps caps the render rate; the simulation runs at SIMULATION_HZ
+        regardless, and frames in between steps are interpolated.
+        max_shapes limits shapes made from key presses; shape_budget and
+        particle_budget cap everything alive at once, mouse effects included.
+        quality is "auto" to adapt quality to measured frame times, or one of
+        QUALITY_NAMES to hold that level. sim_thread steps the simulation on
+        a worker thread in real time while this thread only handles events
+        and draws; such sessions can't be recorded. render_backend is one of
+        BACKENDS: "surface" blits onto the display surface, "texture" draws
+        through SDL's renderer with sprites uploaded once as textures.
+        """
+        # Startup timing breakdown, in seconds
+        self.show_startup_timings = show_startup_timings
+        self.startup_timings = {}
+        self.startup_start = time.perf_counter()
+        self.sound_timings_reported = False
+        
+        self.seeds = seeds if seeds is not None else make_seeds(seed)
+        shapes.seed(self.seeds['shapes'])
+        game_clock.reset()
+        
+        checkpoint = self.startup_start
+        # Set the mixer format first, or pygame.init() opens it with its defaults
+        pygame.mixer.pre_init(MIXER_FREQUENCY, MIXER_SIZE, MIXER_CHANNELS, audio_buffer)
         pygame.init()
-        self.display = Display()
+        checkpoint = self.record_startup_timing('pygame_init', checkpoint)
+        self.display = Display(dirty_rects, full_update_fraction, screen_size, render_backend)
+        checkpoint = self.record_startup_timing('display', checkpoint)
         self.input_handler = InputHandler()
-        self.shape_manager = ShapeManager()
-        self.animation_manager = AnimationManager()
+        sound_manager = SoundManager(buffer=audio_buffer, max_voices=max_voices,
+                                     max_triggers_per_frame=max_triggers_per_frame)
+        checkpoint = self.record_startup_timing('sound_manager', checkpoint)
+        self.budget = EntityBudget(shapes=max(shape_budget, max_shapes), particles=particle_budget)
+        self.shape_manager = ShapeManager(sound_manager, seed=self.seeds['shape_manager'],
+                                          particle_seed=self.seeds['particles'],
+                                          max_shapes=max_shapes, budget=self.budget)
+        checkpoint = self.record_startup_timing('shape_manager', checkpoint)
+        self.animation_manager = AnimationManager(seed=self.seeds['animations'], budget=self.budget)
+        self.record_startup_timing('animation_manager', checkpoint)
+        
+        # Let the renderer rotate and fade particles instead of the CPU
+        if render_backend == "texture":
+            self.shape_manager.particle_system.renderer.draw_transforms = True
+            self.animation_manager.renderer.draw_transforms = True
         
         # Set screen bounds for shape manager
         width, height = self.display.get_screen_bounds()
         self.shape_manager.set_screen_bounds(width, height)
         
+        # Session recording
+        self.recorder = None
+        if record_path is not None:
+            self.recorder = SessionRecorder(record_path, (width, height), self.seeds)
+        
+        # Frame profiler, with its overlay toggled by Ctrl+Shift+P
+        self.trace_path = trace_path
+        self.profiler = FrameProfiler(trace_frames=TRACE_FRAMES if trace_path else 0)
+        
+        # Time not yet simulated, in milliseconds
+        self.accumulator = 0.0
+        
         self.running = True
+        self.fps = fps
         self.clock = pygame.time.Clock()
         
+        # Quality changes arrive as events, so session logs record them
+        self.quality_level = 0
+        self.governor = None
+        if quality == "auto":
+            self.governor = QualityGovernor(budget_ms=1000 / fps)
+        elif QUALITY_NAMES.index(quality) != 0:
+            pygame.event.post(pygame.event.Event(QUALITY_CHANGED, level=QUALITY_NAMES.index(quality)))
+        
+        # Optional simulation thread, started with the game loop
+        self.simulation = None
+        if sim_thread:
+            if self.recorder is not None:
+                raise ValueError("Sessions can't be recorded with the simulation thread")
+            self.simulation = SimulationThread(self.shape_manager, self.animation_manager,
+                                               self.step_simulation, STEP_MS, MAX_STEPS_PER_FRAME)
+    
+    def record_startup_timing(self, name, since):
+        """Record the time taken by a startup stage and return the current time."""
+        now = time.perf_counter()
+        self.startup_timings[name] = now - since
+        return now
+    
+    def print_startup_timings(self):
+        """Print how long each part of startup took."""
+        logger.info("⏱️  Startup timings:")
+        for name, seconds in self.startup_timings.items():
+            logger.info("   %s: %.1f ms", name, seconds * 1000)
+        
+        sound_manager = self.shape_manager.sound_manager
+        self.sound_timings_reported = sound_manager.is_ready()
+        status = "ready" if self.sound_timings_reported else "still preparing in background"
+        logger.info("   sounds (%s):", status)
+        for name, seconds in sound_manager.startup_timings.items():
+            logger.info("      %s: %.1f ms", name, seconds * 1000)
+    
     def run(self):
         """Main game loop."""
-        print("🎮 Baby Games started! Press any key to create shapes!")
-        print("💡 Press Ctrl+Shift+C to exit the game")
-        print("🖱️  Mouse buttons create special effects:")
-        print("   Left click: Rainbow trail")
-        print("   Middle click: Expanding circles")
-        print("   Right click: Star burst")
-        print("   Side button 1: Spiral effect")
-        print("   Side button 2: Fireworks")
-        print("   Side button 3: Butterfly swarm")
-        print("   Side button 4: Cosmic portal")
+        logger.info("🎮 Baby Games started! Press any key to create shapes!")
+        logger.info("💡 Press Ctrl+Shift+C to exit the game")
+        logger.info("🖱️  Mouse buttons create special effects:")
+        logger.info("   Left click: Rainbow trail")
+        logger.info("   Middle click: Expanding circles")
+        logger.info("   Right click: Star burst")
+        logger.info("   Side button 1: Spiral effect")
+        logger.info("   Side button 2: Fireworks")
+        logger.info("   Side button 3: Butterfly swarm")
+        logger.info("   Side button 4: Cosmic portal")
         
         last_time = pygame.time.get_ticks()
+        if self.simulation is not None:
+            self.simulation.start()
         
         try:
             while self.running:
@@ -49,54 +179,205 @@ class BabyGame:
                 dt = current_time - last_time
                 last_time = current_time
                 
-                # Get current mouse position
-                mouse_pos = pygame.mouse.get_pos()
-                
-                # Handle events
-                for event in pygame.event.get():
-                    if event.type == pygame.QUIT:
-                        self.running = False
-                    elif event.type == pygame.KEYDOWN:
-                        self.handle_key_press(event)
-                    elif event.type == pygame.MOUSEBUTTONDOWN:
-                        self.handle_mouse_click(event)
-                
-                # Update animations and shapes
-                self.animation_manager.update()
-                self.shape_manager.update()
-                self.shape_manager.update_mouse_tail(mouse_pos, dt)
-                
-                # Render everything
-                self.display.clear()
-                self.shape_manager.draw(self.display.screen)
-                self.shape_manager.draw_mouse_tail(self.display.screen)
-                self.animation_manager.draw_particles(self.display.screen)
-                self.display.update()
+                self.run_frame(dt)
                 
                 # Cap the frame rate
-                self.clock.tick(60)
+                self.clock.tick(self.fps)
+                
+                # Adapt quality to the time the frame took, not counting the wait
+                if self.governor is not None:
+                    level = self.governor.record(self.clock.get_rawtime())
+                    if level is not None:
+                        pygame.event.post(pygame.event.Event(QUALITY_CHANGED, level=level))
         finally:
             # Clean up resources
-            self.shape_manager.cleanup()
+            self.cleanup()
         
         pygame.quit()
         sys.exit()
     
+    def replay_session(self, player, realtime=True):
+        """Replay a recorded session, at recorded speed or as fast as possible."""
+        logger.info("▶️  Replaying %s (%s)", player.path, "recorded speed" if realtime else "as fast as possible")
+        start = time.perf_counter()
+        frames = 0
+        
+        try:
+            next_frame_time = start
+            for dt, mouse_pos, events in player.frames():
+                # Only quitting is taken from the real event queue
+                if pygame.event.get(pygame.QUIT):
+                    break
+                
+                self.run_frame(dt, mouse_pos, events)
+                frames += 1
+                
+                if realtime:
+                    next_frame_time += dt / 1000
+                    delay = next_frame_time - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+        finally:
+            self.cleanup()
+        
+        elapsed = time.perf_counter() - start
+        logger.info("⏹️  Replayed %d frames in %.2fs; %d shapes and %d particles at the end",
+                    frames, elapsed, self.shape_manager.get_shape_count(),
+                    self.shape_manager.get_particle_count())
+    
+    def cleanup(self):
+        """Clean up resources."""
+        if self.simulation is not None:
+            self.simulation.stop()
+        if self.recorder is not None:
+            self.recorder.close()
+        if self.trace_path is not None:
+            frames = self.profiler.write_trace(self.trace_path)
+            logger.info("📈 Wrote %d profiled frames to %s", frames, self.trace_path)
+            self.trace_path = None
+        self.shape_manager.cleanup()
+    
+    def run_frame(self, dt, mouse_pos=None, events=None):
+        """Handle events, update and render one frame.
+        
+        dt is the time since the last frame in milliseconds. mouse_pos and
+        events default to the real mouse position and event queue.
+        """
+        profiler = self.profiler
+        profiler.begin_frame()
+        self.shape_manager.begin_frame()
+        
+        # Get current mouse position and input
+        if mouse_pos is None:
+            mouse_pos = pygame.mouse.get_pos()
+        if events is None:
+            events = pygame.event.get()
+        if self.recorder is not None:
+            self.recorder.record_frame(dt, mouse_pos, events)
+        
+        # Handle events
+        for event in events:
+            if event.type == pygame.QUIT:
+                self.running = False
+            elif event.type == pygame.KEYDOWN:
+                self.handle_key_press(event)
+            elif event.type == pygame.MOUSEBUTTONDOWN:
+                self.handle_mouse_click(event)
+            elif event.type == QUALITY_CHANGED:
+                self.set_quality(event.level)
+        profiler.mark("events")
+        
+        if self.simulation is None:
+            # Run as many fixed simulation steps as the elapsed time covers
+            steps = self.take_simulation_steps(dt)
+            for _ in range(steps):
+                self.animation_manager.update()
+            profiler.mark("animation_update")
+            for _ in range(steps):
+                # Advance game time used for shape lifetimes
+                game_clock.advance(STEP_MS)
+                self.shape_manager.update()
+            profiler.mark("shape_update")
+            scene = self.shape_manager
+            effects = self.animation_manager
+            alpha = self.accumulator / STEP_MS
+        else:
+            # The simulation thread steps on its own; draw its latest snapshot
+            scene = effects = self.simulation.acquire_front()
+            alpha = scene.get_alpha(STEP_MS)
+            profiler.mark("animation_update")
+            profiler.mark("shape_update")
+        self.shape_manager.update_mouse_tail(mouse_pos, dt)
+        profiler.mark("tail_update")
+        
+        # Render everything, part of the way from the last step to the next
+        self.display.clear()
+        profiler.mark("clear")
+        dirty_rects = scene.draw(self.display.screen, alpha)
+        profiler.mark("shape_draw")
+        dirty_rects += self.shape_manager.draw_mouse_tail(self.display.screen)
+        profiler.mark("tail_draw")
+        dirty_rects += effects.draw_particles(self.display.screen, alpha)
+        profiler.mark("effect_draw")
+        overlay_rect = profiler.draw_overlay(self.display.screen)
+        if overlay_rect is not None:
+            dirty_rects.append(overlay_rect)
+        profiler.mark("overlay")
+        self.display.update(dirty_rects)
+        profiler.mark("present")
+        profiler.end_frame(self.shape_manager.get_shape_count(),
+                           self.shape_manager.get_particle_count()
+                           + self.animation_manager.get_particle_count(),
+                           self.shape_manager.get_tail_length(),
+                           self.budget.get_pressure())
+        
+        # Report startup timings once the first frame is on screen
+        if 'first_frame' not in self.startup_timings:
+            self.startup_timings['first_frame'] = time.perf_counter() - self.startup_start
+            if self.show_startup_timings:
+                self.print_startup_timings()
+        elif (self.show_startup_timings and not self.sound_timings_reported
+              and self.shape_manager.sound_manager.is_ready()):
+            self.print_startup_timings()
+        
+        # Write out this frame's tallied log events in one go
+        game_log.end_frame()
+    
+    def set_quality(self, level):
+        """Switch every quality setting to a level from QUALITY_LEVELS."""
+        self.quality_level = level
+        self.shape_manager.apply_quality(QUALITY_LEVELS[level])
+    
+    def step_simulation(self):
+        """Advance the simulation by one fixed step, as the simulation thread does."""
+        self.animation_manager.update()
+        game_clock.advance(STEP_MS)
+        self.shape_manager.update()
+    
+    def simulate(self, command, *args):
+        """Run a command that changes the simulation, on its thread if it has one."""
+        if self.simulation is not None:
+            self.simulation.submit(command, *args)
+        else:
+            command(*args)
+    
+    def take_simulation_steps(self, dt):
+        """Add dt to the accumulator and take out the whole steps it now holds."""
+        self.accumulator += dt
+        steps = int(self.accumulator // STEP_MS)
+        if steps > MAX_STEPS_PER_FRAME:
+            # Too far behind (e.g. after a stall); skip ahead rather than spiral
+            steps = MAX_STEPS_PER_FRAME
+            self.accumulator = 0.0
+        else:
+            self.accumulator -= steps * STEP_MS
+        return steps
+    
     def handle_key_press(self, event):
         """Handle keyboard input and create shapes."""
         # Check for exit combination (Ctrl+Shift+C)
         if (event.key == pygame.K_c and 
-            pygame.key.get_mods() & pygame.KMOD_CTRL and 
-            pygame.key.get_mods() & pygame.KMOD_SHIFT):
-            print("👋 Goodbye! Thanks for playing!")
+            event.mod & pygame.KMOD_CTRL and 
+            event.mod & pygame.KMOD_SHIFT):
+            logger.info("👋 Goodbye! Thanks for playing!")
             self.running = False
             return
         
+        # Toggle the profiler overlay (Ctrl+Shift+P)
+        if (event.key == pygame.K_p and 
+            event.mod & pygame.KMOD_CTRL and 
+            event.mod & pygame.KMOD_SHIFT):
+            self.profiler.toggle_overlay()
+            return
+        
         # Create a new shape for any other key press
-        shape = self.shape_manager.create_shape_from_key(event.key)
-        if shape:
+        self.simulate(self.create_key_shape, event.key)
+    
+    def create_key_shape(self, key):
+        """Create the shape for a key, with its special effects."""
+        shape = self.shape_manager.create_shape_from_key(key)
+        if shape is not None:
             self.animation_manager.add_shape(shape)
-            print(f"✨ Created {shape.shape_type} with color {shape.color_name}!")
     
     def handle_mouse_click(self, event):
         """Handle mouse button clicks and create special effects."""
@@ -105,25 +386,114 @@ class BabyGame:
         
         # Get action description
         action_desc = self.input_handler.get_mouse_action_description(button)
-        print(f"🖱️  Mouse button {button} pressed at {mouse_pos}: {action_desc}")
+        game_log.tally(logging.DEBUG, "🖱️  Mouse button %d pressed: %s", button, action_desc)
         
         # Handle the mouse action
-        self.shape_manager.handle_mouse_action(button, mouse_pos)
+        self.simulate(self.shape_manager.handle_mouse_action, button, mouse_pos)
+
+
+def parse_args(argv=None):
+    """Parse command line options."""
+    parser = argparse.ArgumentParser(description="Baby Games - press keys to make shapes")
+    parser.add_argument("--dirty-rects", action="store_true",
+                        help="only redraw and present the screen areas that changed")
+    parser.add_argument("--full-update-fraction", type=float, default=0.5,
+                        help="in dirty-rect mode, flip the whole screen when the changed "
+                             "area covers more than this fraction (default: 0.5)")
+    parser.add_argument("--startup-timings", action="store_true",
+                        help="print a breakdown of startup time once the first frame is shown")
+    parser.add_argument("--audio-buffer", type=int, default=512,
+                        help="mixer buffer size in samples; smaller means lower latency (default: 512)")
+    parser.add_argument("--max-voices", type=int, default=8,
+                        help="most sounds that can play at once (default: 8)")
+    parser.add_argument("--max-sounds-per-frame", type=int, default=2,
+                        help="sound triggers allowed per frame before extra ones are dropped (default: 2)")
+    parser.add_argument("--fps", type=int, default=60,
+                        help="frame rate cap, e.g. 30 on slow machines or 144 on fast "
+                             "displays; the simulation speed is unaffected (default: 60)")
+    parser.add_argument("--max-shapes", type=int, default=10,
+                        help="most shapes key presses keep on screen; hundreds for a party (default: 10)")
+    parser.add_argument("--shape-budget", type=int, default=120,
+                        help="most shapes alive at once, including mouse effects (default: 120)")
+    parser.add_argument("--particle-budget", type=int, default=1500,
+                        help="most pop particles alive at once (default: 1500)")
+    parser.add_argument("--seed", type=int,
+                        help="seed every random source so a session can be repeated")
+    parser.add_argument("--record", metavar="PATH",
+                        help="record the session's input to a log file for later replay")
+    parser.add_argument("--replay", metavar="PATH",
+                        help="replay a recorded session log instead of reading input")
+    parser.add_argument("--fast", action="store_true",
+                        help="with --replay, run as fast as possible instead of at recorded speed")
+    parser.add_argument("--headless", action="store_true",
+                        help="use SDL's dummy video and audio drivers (no window, no sound)")
+    parser.add_argument("--profile-trace", metavar="PATH",
+                        help="write per-stage frame timings as Chrome trace-event JSON on exit")
+    parser.add_argument("--quality", choices=("auto",) + QUALITY_NAMES, default="auto",
+                        help="visual quality; auto lowers it when frames run over budget "
+                             "and raises it again when there is headroom (default: auto)")
+    parser.add_argument("--log-level", choices=tuple(game_log.LEVELS), default="info",
+                        help="least severe messages to log; debug reports every shape, "
+                             "pop and mouse effect (default: info)")
+    parser.add_argument("--sim-thread", action="store_true",
+                        help="step the simulation on a worker thread and only draw on the main "
+                             "thread (can't be combined with --record or --replay)")
+    parser.add_argument("--render-backend", choices=BACKENDS, default="surface",
+                        help="surface blits onto the display surface; texture draws through "
+                             "SDL's renderer, which rotates, scales and fades sprites itself "
+                             "(default: surface)")
+    args = parser.parse_args(argv)
+    for option in ("max_shapes", "shape_budget", "particle_budget"):
+        if getattr(args, option) <= 0:
+            parser.error(f"--{option.replace('_', '-')} must be positive")
+    if args.sim_thread and (args.record or args.replay):
+        parser.error("--sim-thread can't be combined with --record or --replay")
+    return args
 
 
 def main():
     """Main entry point."""
+    args = parse_args()
+    if args.headless:
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+        os.environ["SDL_AUDIODRIVER"] = "dummy"
+    game_log.setup(game_log.LEVELS[args.log_level])
+    
     try:
-        game = BabyGame()
-        game.run()
+        player = SessionPlayer(args.replay) if args.replay else None
+        game = BabyGame(dirty_rects=args.dirty_rects,
+                        full_update_fraction=args.full_update_fraction,
+                        show_startup_timings=args.startup_timings,
+                        audio_buffer=args.audio_buffer,
+                        max_voices=args.max_voices,
+                        max_triggers_per_frame=args.max_sounds_per_frame,
+                        seed=args.seed,
+                        seeds=player.seeds if player else None,
+                        screen_size=player.screen_size if player else None,
+                        record_path=args.record,
+                        trace_path=args.profile_trace,
+                        fps=args.fps,
+                        max_shapes=args.max_shapes,
+                        shape_budget=args.shape_budget,
+                        particle_budget=args.particle_budget,
+                        quality=args.quality,
+                        sim_thread=args.sim_thread,
+                        render_backend=args.render_backend)
+        if player:
+            game.replay_session(player, realtime=not args.fast)
+            pygame.quit()
+        else:
+            game.run()
     except KeyboardInterrupt:
-        print("\n👋 Game interrupted. Goodbye!")
+        logger.info("\n👋 Game interrupted. Goodbye!")
         pygame.quit()
         sys.exit()
     except Exception as e:
-        print(f"❌ Error: {e}")
+        logger.error("❌ Error: %s", e)
         pygame.quit()
         sys.exit(1)
+    finally:
+        game_log.shutdown()
 
 
 if __name__ == "__main__":
@@ -4,19 +4,28 @@ Creates a glowing tail that follows the mouse cursor.
 """
 
 import pygame
-import math
-import random
+import numpy as np
+
+# Largest tail length allowed by set_max_length, and the ring buffer size
+MAX_TAIL_LENGTH = 50
+
+
+def bezier_basis(steps):
+    """Get the cubic Bezier basis matrix for steps + 1 evenly spaced t values."""
+    t = np.linspace(0.0, 1.0, steps + 1)[:, None]
+    return np.hstack([(1 - t) ** 3, 3 * (1 - t) ** 2 * t, 3 * (1 - t) * t ** 2, t ** 3])
 
 
 class MouseTail:
     def __init__(self, max_length=30):
-        """Initialize the mouse tail."""
-        self.max_length = max_length
-        self.positions = []  # List of (x, y) positions
-        self.colors = []     # List of colors for each segment
-        self.alpha_values = []  # List of alpha values for fading effect
+        """Initialize the mouse tail.
+
+        Tail samples live in fixed-size NumPy ring buffers and are added by
+        distance travelled, not once per frame.
+        """
+        self.max_length = min(max_length, MAX_TAIL_LENGTH)
         self.base_color = (255, 255, 255)  # White base color
-        
+
         # Fiery shooting star colors - warm to cool gradient
         self.glow_colors = [
             (255, 255, 255),  # Bright white center
@@ -30,140 +39,186 @@ class MouseTail:
             (200, 50, 50),    # Dark red
             (150, 50, 50),    # Darker red
         ]
-        
+
+        # Ring buffers; head is the slot of the newest sample
+        self.points = np.zeros((MAX_TAIL_LENGTH, 2))
+        self.color_indices = np.zeros(MAX_TAIL_LENGTH, dtype=np.int32)
+        self.head = 0
+        self.count = 0
+
+        # Arc-length sampling: one sample per sample_spacing pixels moved.
+        # A resting cursor retracts the tail by one sample per retract_interval ms.
+        self.sample_spacing = 12.0
+        self.retract_interval = 1000 / 60
+        self.idle_time = 0
+
+        # Curve rendering
+        self.layers = 3
+        self.bezier_steps = 10
+        self.basis = bezier_basis(self.bezier_steps)
+
         self.current_glow_index = 0
         self.glow_change_timer = 0
         self.glow_change_interval = 300  # Change glow color every 300ms
         self.smoothing_factor = 0.3  # For smooth interpolation
         self.last_pos = None
-        
+
+        # Reusable scratch surface, recreated only when the screen size changes
+        self.tail_surface = None
+        self.tail_padding = 20  # Widest segment / glow radius around the points
+        self.dirty_rect = None  # Screen area covered by the last draw
+        self.scratch_rect = None  # Scratch area that may hold old pixels
+
+    @property
+    def positions(self):
+        """Get the tail samples as an (n, 2) array, newest first."""
+        order = (self.head - np.arange(self.count)) % MAX_TAIL_LENGTH
+        return self.points[order]
+
     def update(self, mouse_pos, dt):
         """Update the tail with new mouse position."""
         x, y = mouse_pos
-        
+
         # Smooth interpolation for less jagged movement
         if self.last_pos is not None:
             smooth_x = x * (1 - self.smoothing_factor) + self.last_pos[0] * self.smoothing_factor
             smooth_y = y * (1 - self.smoothing_factor) + self.last_pos[1] * self.smoothing_factor
             x, y = smooth_x, smooth_y
-        
+
         self.last_pos = (x, y)
-        
-        # Add new position to the front
-        self.positions.insert(0, (x, y))
-        
-        # Add new color and alpha
-        self.colors.insert(0, self.glow_colors[self.current_glow_index])
-        self.alpha_values.insert(0, 255)
-        
-        # Limit the length
-        if len(self.positions) > self.max_length:
-            self.positions.pop()
-            self.colors.pop()
-            self.alpha_values.pop()
-        
-        # Update alpha values for fading effect
-        for i in range(len(self.alpha_values)):
-            fade_factor = i / len(self.alpha_values) if self.alpha_values else 0
-            self.alpha_values[i] = int(255 * (1 - fade_factor * 0.7))  # Less fade for more vibrant tail
-        
+
+        if self.count == 0:
+            self._push(x, y)
+        else:
+            # Add evenly spaced samples along the distance moved
+            last_x, last_y = self.points[self.head]
+            distance = np.hypot(x - last_x, y - last_y)
+            if distance >= self.sample_spacing:
+                samples = min(int(distance // self.sample_spacing), self.max_length)
+                for t in np.linspace(1.0 / samples, 1.0, samples):
+                    self._push(last_x + (x - last_x) * t, last_y + (y - last_y) * t)
+                self.idle_time = 0
+            else:
+                # Let the tail shrink back into the cursor while it rests
+                self.idle_time += dt
+                while self.idle_time >= self.retract_interval and self.count > 1:
+                    self.idle_time -= self.retract_interval
+                    self.count -= 1
+
         # Update glow color change timer
         self.glow_change_timer += dt
         if self.glow_change_timer >= self.glow_change_interval:
             self.current_glow_index = (self.current_glow_index + 1) % len(self.glow_colors)
             self.glow_change_timer = 0
-    
+
+    def _push(self, x, y):
+        """Add a new sample at the front of the ring buffer."""
+        self.head = (self.head + 1) % MAX_TAIL_LENGTH
+        self.points[self.head] = (x, y)
+        self.color_indices[self.head] = self.current_glow_index
+        self.count = min(self.count + 1, self.max_length)
+
     def draw(self, screen):
         """Draw the glowing tail."""
-        if len(self.positions) < 2:
+        if self.count == 0:
+            self.dirty_rect = None
             return
-        
-        # Create a surface for the tail
-        tail_surface = pygame.Surface(screen.get_size(), pygame.SRCALPHA)
-        
-        # Draw tail segments with smooth curves
-        for i in range(len(self.positions) - 1):
-            if i + 1 >= len(self.positions):
-                continue
-                
-            start_pos = self.positions[i]
-            end_pos = self.positions[i + 1]
-            
-            # Calculate segment properties - bigger and more vibrant
-            segment_width = max(8, int(20 * (1 - i / len(self.positions))))
-            color = self.colors[i]
-            alpha = self.alpha_values[i]
-            
+
+        # Reuse the scratch surface unless the screen size changed
+        if self.tail_surface is None or self.tail_surface.get_size() != screen.get_size():
+            self.tail_surface = pygame.Surface(screen.get_size(), pygame.SRCALPHA)
+            self.scratch_rect = None
+        tail_surface = self.tail_surface
+
+        positions = self.positions
+
+        # Only work inside the bounding rect of the tail points
+        tail_rect = self.get_bounding_rect(positions).clip(tail_surface.get_rect())
+        clear_rect = tail_rect if self.scratch_rect is None else tail_rect.union(self.scratch_rect)
+        tail_surface.fill((0, 0, 0, 0), clear_rect)
+        self.scratch_rect = tail_rect
+
+        if self.count >= 2:
+            self.draw_segments(tail_surface, positions)
+
+        # Draw a bright center point at the mouse position. The display
+        # surface has no alpha, so the old glow layers all came out as one
+        # opaque disc; drawing it here lets any screen take the tail in one blit
+        pygame.draw.circle(tail_surface, (255, 255, 255, 255), positions[0].tolist(), 15)
+
+        # Draw the tail area of the surface onto the screen
+        screen.blit(tail_surface, tail_rect, tail_rect)
+        self.dirty_rect = tail_rect
+
+    def draw_segments(self, surface, positions):
+        """Draw every tail segment, curving all interior segments at once."""
+        n = len(positions)
+        starts = positions[:-1]
+        ends = positions[1:]
+
+        # Segment widths, colors and fading alpha, newest first
+        index = np.arange(n - 1)
+        widths = np.maximum(8, (20 * (1 - index / n)).astype(int)).tolist()
+        alphas = (255 * (1 - index / n * 0.7)).astype(int).tolist()
+        order = (self.head - index) % MAX_TAIL_LENGTH
+        colors = [self.glow_colors[i] for i in self.color_indices[order].tolist()]
+
+        # Evaluate all interior Bezier segments with one matrix multiply
+        curves = {}
+        if n > 3:
+            prev = positions[:-3]
+            start = starts[1:-1]
+            end = ends[1:-1]
+            control = np.stack([start,
+                                start + (end - prev) * 0.25,
+                                end + (start - end) * 0.25,
+                                end], axis=1)
+            points = np.einsum('sk,mkd->msd', self.basis, control).astype(int)
+            curves = dict(enumerate(points.tolist(), start=1))
+
+        straight = np.stack([starts, ends], axis=1).tolist()
+
+        for i in range(n - 1):
+            segment_points = curves.get(i, straight[i])
+
             # Create multiple layers for a more fiery effect
-            for layer in range(3):
-                layer_width = segment_width - layer * 3
+            for layer in range(self.layers):
+                layer_width = widths[i] - layer * 3
                 if layer_width <= 0:
                     continue
-                    
-                layer_alpha = int(alpha * (1 - layer * 0.3))
-                layer_color = (*color, layer_alpha)
-                
-                # Draw smooth curve instead of straight line
-                if i > 0 and i < len(self.positions) - 2:
-                    # Use quadratic curve for smoother appearance
-                    prev_pos = self.positions[i - 1]
-                    next_pos = self.positions[i + 1]
-                    
-                    # Calculate control points for smooth curve
-                    cp1_x = start_pos[0] + (end_pos[0] - prev_pos[0]) * 0.25
-                    cp1_y = start_pos[1] + (end_pos[1] - prev_pos[1]) * 0.25
-                    cp2_x = end_pos[0] + (start_pos[0] - next_pos[0]) * 0.25
-                    cp2_y = end_pos[1] + (start_pos[1] - next_pos[1]) * 0.25
-                    
-                    # Draw curved segment
-                    self.draw_curved_line(tail_surface, start_pos, (cp1_x, cp1_y), 
-                                        (cp2_x, cp2_y), end_pos, layer_color, layer_width)
-                else:
-                    # Draw straight line for end segments
-                    pygame.draw.line(tail_surface, layer_color, start_pos, end_pos, layer_width)
-        
-        # Draw the tail surface onto the screen
-        screen.blit(tail_surface, (0, 0))
-        
-        # Draw a bright center point at the mouse position
-        if self.positions:
-            center_pos = self.positions[0]
-            # Draw multiple glow layers for shooting star effect
-            for i in range(4):
-                glow_size = 15 - i * 3
-                glow_alpha = 150 - i * 30
-                pygame.draw.circle(screen, (255, 255, 255, glow_alpha), center_pos, glow_size)
-            # Draw inner bright point
-            pygame.draw.circle(screen, (255, 255, 255, 255), center_pos, 5)
-    
+
+                layer_alpha = int(alphas[i] * (1 - layer * 0.3))
+                pygame.draw.lines(surface, (*colors[i], layer_alpha), False,
+                                  segment_points, layer_width)
+
+    def get_bounding_rect(self, positions=None):
+        """Get the rect around the tail points, padded for line width and glow."""
+        if positions is None:
+            positions = self.positions
+        left, top = (positions.min(axis=0) - self.tail_padding).astype(int).tolist()
+        right, bottom = (positions.max(axis=0) + self.tail_padding + 1).astype(int).tolist()
+        return pygame.Rect(left, top, right - left, bottom - top)
+
+    def get_dirty_rect(self):
+        """Get the screen rect the tail covered on its last draw, or None."""
+        return self.dirty_rect
+
     def clear(self):
         """Clear the tail."""
-        self.positions.clear()
-        self.colors.clear()
-        self.alpha_values.clear()
-    
+        self.count = 0
+        self.idle_time = 0
+
     def set_max_length(self, length):
         """Set the maximum length of the tail."""
-        self.max_length = max(5, min(50, length))  # Clamp between 5 and 50
-    
-    def draw_curved_line(self, surface, start, cp1, cp2, end, color, width):
-        """Draw a curved line using control points."""
-        # Simple approximation using multiple line segments
-        steps = 10
-        points = []
-        
-        for i in range(steps + 1):
-            t = i / steps
-            # Cubic Bezier curve
-            x = (1-t)**3 * start[0] + 3*(1-t)**2*t * cp1[0] + 3*(1-t)*t**2 * cp2[0] + t**3 * end[0]
-            y = (1-t)**3 * start[1] + 3*(1-t)**2*t * cp1[1] + 3*(1-t)*t**2 * cp2[1] + t**3 * end[1]
-            points.append((int(x), int(y)))
-        
-        # Draw line segments
-        for i in range(len(points) - 1):
-            pygame.draw.line(surface, color, points[i], points[i+1], width)
-    
+        self.max_length = max(5, min(MAX_TAIL_LENGTH, length))  # Clamp between 5 and 50
+        self.count = min(self.count, self.max_length)
+
+    def set_bezier_steps(self, steps):
+        """Set how many line pieces each curved segment is drawn with."""
+        self.bezier_steps = max(1, steps)
+        self.basis = bezier_basis(self.bezier_steps)
+
     def add_sparkle_effect(self, pos):
         """Add a sparkle effect at the given position."""
         # This could be expanded to add particle effects
-        pass 
\ No newline at end of file
+        pass
@@ -0,0 +1,139 @@
+"""
+Particle Renderer module for Baby Games
+Draws particles from pre-baked alpha-ramp sprites in one batched blit call.
+"""
+
+import math
+import pygame
+from sprite_cache import SpriteCache
+
+# Particle types that look the same at every angle
+ROTATION_INVARIANT_TYPES = {"circle"}
+
+
+def render_particle_sprite(particle_type, color, size, alpha=255):
+    """Render an unrotated particle onto a new surface."""
+    surface = pygame.Surface((size * 2, size * 2), pygame.SRCALPHA)
+    color = (*color, alpha)
+
+    # Draw based on particle type
+    if particle_type == "circle":
+        pygame.draw.circle(surface, color, (size, size), size)
+    elif particle_type == "star":
+        draw_star(surface, size, size, size, color)
+    elif particle_type == "sparkle":
+        draw_sparkle(surface, size, size, size, color)
+    elif particle_type == "square":
+        rect = pygame.Rect(0, 0, size * 2, size * 2)
+        pygame.draw.rect(surface, color, rect)
+    else:
+        # Default to circle
+        pygame.draw.circle(surface, color, (size, size), size)
+
+    return surface
+
+
+def draw_star(surface, x, y, size, color):
+    """Draw a star particle."""
+    points = []
+    for i in range(5):
+        angle = i * 2 * math.pi / 5
+        radius = size if i % 2 == 0 else max(1, size // 2)
+        points.append((x + radius * math.cos(angle), y + radius * math.sin(angle)))
+    pygame.draw.polygon(surface, color, points)
+
+
+def draw_sparkle(surface, x, y, size, color):
+    """Draw a sparkle particle."""
+    for i in range(4):
+        angle = i * math.pi / 2
+        end_x = x + size * math.cos(angle)
+        end_y = y + size * math.sin(angle)
+        pygame.draw.line(surface, color, (x, y), (end_x, end_y), 2)
+
+
+class ParticleRenderer:
+    def __init__(self, alpha_levels=16, max_bytes=16 * 1024 * 1024, rotation_steps=32):
+        """Initialize the particle renderer.
+
+        Each (particle_type, color, size) sprite is baked once at
+        alpha_levels evenly spaced opacities; rotated frames come from the
+        cache's rotation atlas.
+        """
+        self.alpha_levels = alpha_levels
+        self.cache = SpriteCache(max_bytes=max_bytes, rotation_steps=rotation_steps)
+        self.batch = []
+
+        # With a TextureScreen, sprites stay unrotated at full alpha and the
+        # renderer applies each particle's rotation and alpha
+        self.draw_transforms = False
+
+        # Per-frame statistics; every cache miss allocates one surface
+        self.extra_allocations = 0
+        self.last_misses = 0
+        self.frame_blits = 0
+        self.frame_allocations = 0
+        self.total_allocations = 0
+
+    def _bake_ramp(self, particle_type, color, size):
+        """Render a sprite at every alpha level and store them in the cache."""
+        ramp = []
+        for level in range(1, self.alpha_levels + 1):
+            alpha = round(255 * level / self.alpha_levels)
+            surface = render_particle_sprite(particle_type, color, size, alpha)
+            self.cache.put((particle_type, color, size, level), surface)
+            ramp.append(surface)
+
+        # The requested level is counted as a cache miss, the rest are extra
+        self.extra_allocations += len(ramp) - 1
+        return ramp
+
+    def get_sprite(self, particle_type, color, size, alpha, rotation=0.0):
+        """Get the baked sprite closest to the requested alpha and rotation."""
+        level = min(self.alpha_levels, max(1, math.ceil(alpha * self.alpha_levels / 255)))
+        key = (particle_type, color, size, level)
+        render = lambda: self._bake_ramp(particle_type, color, size)[level - 1]
+
+        if particle_type in ROTATION_INVARIANT_TYPES:
+            return self.cache.get(key, render)
+        return self.cache.get_rotated(key, render, rotation)
+
+    def add(self, particle_type, color, size, x, y, alpha, rotation=0.0):
+        """Queue a particle centred on (x, y) for the next flush."""
+        if alpha <= 0:
+            return
+        if self.draw_transforms:
+            surface = self.get_sprite(particle_type, color, size, 255)
+            rotation = 0.0 if particle_type in ROTATION_INVARIANT_TYPES else rotation
+            self.batch.append((surface, (x, y), rotation, alpha))
+            return
+        surface = self.get_sprite(particle_type, color, size, alpha, rotation)
+        width, height = surface.get_size()
+        self.batch.append((surface, (x - width // 2, y - height // 2)))
+
+    def flush(self, screen):
+        """Submit all queued particles with a single blits call."""
+        self.frame_blits = len(self.batch)
+        self.frame_allocations = self.cache.misses - self.last_misses + self.extra_allocations
+        self.total_allocations += self.frame_allocations
+        self.last_misses = self.cache.misses
+        self.extra_allocations = 0
+
+        if not self.batch:
+            return []
+
+        if self.draw_transforms:
+            rects = screen.draw_sprites(self.batch)
+        else:
+            rects = screen.blits(self.batch)
+        self.batch.clear()
+        return rects
+
+    def get_stats(self):
+        """Get blit and surface allocation counts for the last flush, and allocations so far."""
+        return {
+            'blits': self.frame_blits,
+            'allocations': self.frame_allocations,
+            'total_allocations': self.total_allocations,
+            'sprite_cache': self.cache.get_stats(),
+        }
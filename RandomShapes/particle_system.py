@@ -3,139 +3,198 @@ Particle System module for Baby Games
 Handles particle effects for shape popping animations.
 """
 
-import pygame
-import random
 import math
+import numpy as np
+from particle_renderer import ParticleRenderer
 
+# Particle types, indexed by the values stored in ParticleSystem.particle_type
+PARTICLE_TYPES = ("circle", "star", "sparkle", "square")
+
+
+class ParticleSystem:
+    def __init__(self, capacity=256, seed=None, budget=None):
+        """Initialize the particle system.
+
+        Particles live in preallocated structure-of-arrays storage. The
+        first count slots are alive; capacity doubles when a burst needs more.
+        With an EntityBudget, bursts are trimmed to its 'particles' limit.
+        """
+        self.rng = np.random.default_rng(seed)
+        self.renderer = ParticleRenderer()
+        self.count = 0
+        self.peak_count = 0
+        self.budget = budget
+        if budget is not None:
+            budget.track('particles', self.get_particle_count)
+
+        # Colors are stored once in a palette and referenced by index
+        self.palette = []
+        self.palette_index = {}
+
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        """Allocate particle arrays, keeping any live particles."""
+        old_arrays = getattr(self, 'arrays', None)
+
+        self.capacity = capacity
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.prev_x = np.zeros(capacity)  # Position before the last step
+        self.prev_y = np.zeros(capacity)
+        self.velocity_x = np.zeros(capacity)
+        self.velocity_y = np.zeros(capacity)
+        self.rotation = np.zeros(capacity)
+        self.rotation_speed = np.zeros(capacity)
+        self.lifetime = np.zeros(capacity, dtype=np.int32)  # simulation steps
+        self.max_lifetime = np.ones(capacity, dtype=np.int32)
+        self.alpha = np.zeros(capacity, dtype=np.int32)
+        self.size = np.zeros(capacity, dtype=np.int32)
+        self.color_index = np.zeros(capacity, dtype=np.int32)
+        self.particle_type = np.zeros(capacity, dtype=np.int8)
+
+        self.arrays = (self.x, self.y, self.prev_x, self.prev_y,
+                       self.velocity_x, self.velocity_y,
+                       self.rotation, self.rotation_speed, self.lifetime,
+                       self.max_lifetime, self.alpha, self.size,
+                       self.color_index, self.particle_type)
+
+        if old_arrays is not None:
+            for new, old in zip(self.arrays, old_arrays):
+                new[:self.count] = old[:self.count]
+
+    def _get_color_index(self, color):
+        """Get the palette index for a color, adding it if needed."""
+        color = tuple(color)
+        index = self.palette_index.get(color)
+        if index is None:
+            index = len(self.palette)
+            self.palette.append(color)
+            self.palette_index[color] = index
+        return index
+
+    def create_pop_effect(self, x, y, color, num_particles=15):
+        """Create a popping effect at the given position."""
+        if self.budget is not None:
+            num_particles, _ = self.budget.admit('particles', num_particles)
+        if num_particles <= 0:
+            return
+
+        # Grow storage if this burst doesn't fit
+        needed = self.count + num_particles
+        if needed > self.capacity:
+            capacity = self.capacity
+            while capacity < needed:
+                capacity *= 2
+            self._allocate(capacity)
+
+        rng = self.rng
+        new = slice(self.count, needed)
 
-class Particle:
-    def __init__(self, x, y, color, particle_type="circle"):
-        """Initialize a particle with position, color, and type."""
-        self.x = x
-        self.y = y
-        self.color = color
-        self.particle_type = particle_type
-        
         # Random velocity for explosion effect
-        angle = random.uniform(0, 2 * math.pi)
-        speed = random.uniform(2, 8)
-        self.velocity_x = math.cos(angle) * speed
-        self.velocity_y = math.sin(angle) * speed
-        
+        angle = rng.uniform(0, 2 * math.pi, num_particles)
+        speed = rng.uniform(2, 8, num_particles)
+
+        self.x[new] = x
+        self.y[new] = y
+        self.prev_x[new] = x
+        self.prev_y[new] = y
+        self.velocity_x[new] = np.cos(angle) * speed
+        self.velocity_y[new] = np.sin(angle) * speed
+
         # Particle properties
-        self.size = random.randint(3, 8)
-        self.lifetime = random.randint(30, 60)  # frames
-        self.max_lifetime = self.lifetime
-        self.alpha = 255
-        self.rotation = random.uniform(0, 360)
-        self.rotation_speed = random.uniform(-10, 10)
-        
+        self.size[new] = rng.integers(3, 9, num_particles)
+        self.lifetime[new] = rng.integers(30, 61, num_particles)
+        self.max_lifetime[new] = self.lifetime[new]
+        self.alpha[new] = 255
+        self.rotation[new] = rng.uniform(0, 360, num_particles)
+        self.rotation_speed[new] = rng.uniform(-10, 10, num_particles)
+        self.color_index[new] = self._get_color_index(color)
+        self.particle_type[new] = rng.integers(0, len(PARTICLE_TYPES), num_particles)
+
+        self.count = needed
+        self.peak_count = max(self.peak_count, needed)
+
     def update(self):
-        """Update particle position and properties."""
-        self.x += self.velocity_x
-        self.y += self.velocity_y
-        
-        # Slow down over time
-        self.velocity_x *= 0.95
-        self.velocity_y *= 0.95
-        
+        """Advance all particles by one simulation step."""
+        n = self.count
+        if n == 0:
+            return
+
+        # Move, then slow down over time
+        self.prev_x[:n] = self.x[:n]
+        self.prev_y[:n] = self.y[:n]
+        self.x[:n] += self.velocity_x[:n]
+        self.y[:n] += self.velocity_y[:n]
+        self.velocity_x[:n] *= 0.95
+        self.velocity_y[:n] *= 0.95
+
         # Update rotation
-        self.rotation += self.rotation_speed
-        
+        self.rotation[:n] += self.rotation_speed[:n]
+
         # Update lifetime and alpha
-        self.lifetime -= 1
-        if self.lifetime > 0:
-            self.alpha = int(255 * (self.lifetime / self.max_lifetime))
-        
-    def is_alive(self):
-        """Check if particle is still alive."""
-        return self.lifetime > 0
-    
-    def draw(self, screen):
-        """Draw the particle on screen."""
-        if self.alpha <= 0:
-            return
-            
-        # Create surface with alpha
-        surface = pygame.Surface((self.size * 2, self.size * 2), pygame.SRCALPHA)
-        
-        # Create color with alpha
-        color_with_alpha = (*self.color, self.alpha)
-        
-        # Draw based on particle type
-        if self.particle_type == "circle":
-            pygame.draw.circle(surface, color_with_alpha, (self.size, self.size), self.size)
-        elif self.particle_type == "star":
-            self.draw_star(surface, self.size, self.size, self.size, color_with_alpha)
-        elif self.particle_type == "sparkle":
-            self.draw_sparkle(surface, self.size, self.size, self.size, color_with_alpha)
-        elif self.particle_type == "square":
-            rect = pygame.Rect(0, 0, self.size * 2, self.size * 2)
-            pygame.draw.rect(surface, color_with_alpha, rect)
-        else:
-            # Default to circle
-            pygame.draw.circle(surface, color_with_alpha, (self.size, self.size), self.size)
-        
-        # Rotate if needed
-        if self.rotation != 0:
-            surface = pygame.transform.rotate(surface, self.rotation)
-        
-        # Get rect for positioning
-        rect = surface.get_rect(center=(int(self.x), int(self.y)))
-        
-        # Draw to screen
-        screen.blit(surface, rect)
-    
-    def draw_star(self, surface, x, y, size, color):
-        """Draw a star particle."""
-        points = []
-        for i in range(5):
-            angle = i * 2 * math.pi / 5
-            radius = size if i % 2 == 0 else max(1, size // 2)
-            points.append((x + radius * math.cos(angle), y + radius * math.sin(angle)))
-        pygame.draw.polygon(surface, color, points)
-    
-    def draw_sparkle(self, surface, x, y, size, color):
-        """Draw a sparkle particle."""
-        for i in range(4):
-            angle = i * math.pi / 2
-            end_x = x + size * math.cos(angle)
-            end_y = y + size * math.sin(angle)
-            pygame.draw.line(surface, color, (x, y), (end_x, end_y), 2)
+        lifetime = self.lifetime[:n]
+        lifetime -= 1
+        np.floor_divide(255 * lifetime, self.max_lifetime[:n], out=self.alpha[:n])
 
+        # Compact live particles to the front of the arrays
+        alive = lifetime > 0
+        if not alive.all():
+            keep = np.flatnonzero(alive)
+            for array in self.arrays:
+                array[:len(keep)] = array[keep]
+            self.count = len(keep)
+
+    def draw(self, screen, alpha=1.0):
+        """Draw all particles and return the screen rects they cover.
+
+        alpha interpolates positions between the previous simulation step
+        (0.0) and the current one (1.0).
+        """
+        n = self.count
+        if n == 0:
+            return self.renderer.flush(screen)
+
+        prev_x = self.prev_x[:n]
+        prev_y = self.prev_y[:n]
+        xs = (prev_x + (self.x[:n] - prev_x) * alpha).astype(int).tolist()
+        ys = (prev_y + (self.y[:n] - prev_y) * alpha).astype(int).tolist()
+        rotations = self.rotation[:n].tolist()
+        alphas = self.alpha[:n].tolist()
+        sizes = self.size[:n].tolist()
+        color_indices = self.color_index[:n].tolist()
+        types = self.particle_type[:n].tolist()
+
+        add = self.renderer.add
+        for i in range(n):
+            add(PARTICLE_TYPES[types[i]], self.palette[color_indices[i]], sizes[i],
+                xs[i], ys[i], alphas[i], rotations[i])
+
+        return self.renderer.flush(screen)
+
+    def copy_from(self, other):
+        """Make this system a copy of another's live particles, e.g. for a snapshot."""
+        if other.count > self.capacity:
+            self.count = 0
+            self._allocate(other.capacity)
+        n = other.count
+        for mine, theirs in zip(self.arrays, other.arrays):
+            mine[:n] = theirs[:n]
+        self.count = n
+        self.palette = other.palette  # Only ever appended to
+
+    def get_render_stats(self):
+        """Get blit and surface allocation counts for the last draw."""
+        return self.renderer.get_stats()
+
+    def get_pool_stats(self):
+        """Get particle storage use, including the high-water mark."""
+        return {'in_use': self.count, 'capacity': self.capacity, 'peak_in_use': self.peak_count}
 
-class ParticleSystem:
-    def __init__(self):
-        """Initialize the particle system."""
-        self.particles = []
-        
-    def create_pop_effect(self, x, y, color, num_particles=15):
-        """Create a popping effect at the given position."""
-        particle_types = ["circle", "star", "sparkle", "square"]
-        
-        for _ in range(num_particles):
-            particle_type = random.choice(particle_types)
-            particle = Particle(x, y, color, particle_type)
-            self.particles.append(particle)
-    
-    def update(self):
-        """Update all particles."""
-        # Update existing particles
-        for particle in self.particles:
-            particle.update()
-        
-        # Remove dead particles
-        self.particles = [p for p in self.particles if p.is_alive()]
-    
-    def draw(self, screen):
-        """Draw all particles."""
-        for particle in self.particles:
-            particle.draw(screen)
-    
     def get_particle_count(self):
         """Get the current number of particles."""
-        return len(self.particles)
-    
+        return self.count
+
     def clear_all(self):
         """Clear all particles."""
-        self.particles.clear()
\ No newline at end of file
+        self.count = 0
@@ -0,0 +1,207 @@
+"""
+Profiler module for Baby Games
+Times each stage of the game loop, shows the results in an overlay and
+exports them as Chrome trace events.
+
+Open an exported trace in chrome://tracing or https://ui.perfetto.dev.
+"""
+
+import json
+import time
+import numpy as np
+import pygame
+
+# Stages of BabyGame.run_frame, in order
+STAGES = (
+    "events",
+    "animation_update",
+    "shape_update",
+    "tail_update",
+    "clear",
+    "shape_draw",
+    "tail_draw",
+    "effect_draw",
+    "overlay",
+    "present",
+)
+
+# Entity counts recorded each frame
+COUNTERS = ("shapes", "particles", "tail_points")
+
+FRAME_BUDGET_MS = 1000 / 60
+
+
+class FrameProfiler:
+    def __init__(self, window=300, trace_frames=0, overlay_refresh=15):
+        """Initialize the profiler.
+
+        Stage timings and entity counts are kept for the last window frames.
+        When trace_frames is non-zero, up to that many of the most recent
+        frames are also kept for write_trace, as preallocated arrays of stage
+        start times and durations (about 200 bytes a frame); the trace
+        events themselves are only built when writing. The overlay text is
+        re-rendered every overlay_refresh frames.
+        """
+        self.window = window
+        self.stage_index = {name: i for i, name in enumerate(STAGES)}
+        self.samples = np.zeros((window, len(STAGES)))
+        self.counts = np.zeros((window, len(COUNTERS)), dtype=np.int32)
+        self.pressure = np.zeros(window)  # Fullest entity budget, 0.0 to 1.0
+        self.frame_count = 0
+        self.frame_start = 0.0
+        self.last_mark = 0.0
+        self.row = self.samples[0]
+
+        # Trace ring: per-stage start and duration in microseconds since
+        # trace_origin (start is NaN for stages not marked), plus the frame
+        # span and entity counts
+        self.trace_frames = trace_frames
+        self.trace_origin = time.perf_counter()
+        if trace_frames:
+            self.trace_starts = np.full((trace_frames, len(STAGES)), np.nan)
+            self.trace_durations = np.zeros((trace_frames, len(STAGES)))
+            self.trace_spans = np.zeros((trace_frames, 2))
+            self.trace_counts = np.zeros((trace_frames, len(COUNTERS)), dtype=np.int32)
+
+        # Overlay
+        self.overlay_visible = False
+        self.overlay_refresh = overlay_refresh
+        self.overlay_surface = None
+        self.font = None
+
+    def begin_frame(self):
+        """Start timing a new frame."""
+        self.row = self.samples[self.frame_count % self.window]
+        self.row[:] = 0.0
+        self.frame_start = self.last_mark = time.perf_counter()
+        if self.trace_frames:
+            trace_row = self.frame_count % self.trace_frames
+            self.trace_start_row = self.trace_starts[trace_row]
+            self.trace_duration_row = self.trace_durations[trace_row]
+            self.trace_start_row[:] = np.nan
+            self.trace_duration_row[:] = 0.0
+
+    def mark(self, stage):
+        """Attribute the time since the previous mark to stage."""
+        now = time.perf_counter()
+        index = self.stage_index[stage]
+        self.row[index] += (now - self.last_mark) * 1000
+        if self.trace_frames:
+            # A stage marked twice in a frame keeps its first start
+            if self.trace_start_row[index] != self.trace_start_row[index]:
+                self.trace_start_row[index] = (self.last_mark - self.trace_origin) * 1e6
+            self.trace_duration_row[index] += (now - self.last_mark) * 1e6
+        self.last_mark = now
+
+    def end_frame(self, shapes=0, particles=0, tail_points=0, budget_pressure=0.0):
+        """Finish the frame and record its entity counts and budget pressure."""
+        self.counts[self.frame_count % self.window] = (shapes, particles, tail_points)
+        self.pressure[self.frame_count % self.window] = budget_pressure
+        if self.trace_frames:
+            trace_row = self.frame_count % self.trace_frames
+            self.trace_spans[trace_row] = ((self.frame_start - self.trace_origin) * 1e6,
+                                           (self.last_mark - self.frame_start) * 1e6)
+            self.trace_counts[trace_row] = (shapes, particles, tail_points)
+        self.frame_count += 1
+
+    def get_summary(self):
+        """Summarize the timings and counts in the rolling window."""
+        frames = min(self.frame_count, self.window)
+        if frames == 0:
+            return {}
+        samples = self.samples[:frames]
+        totals = samples.sum(axis=1)
+        worst = int(totals.argmax())
+
+        return {
+            'frames': frames,
+            'frame_ms': self._describe(totals),
+            'over_budget': int((totals > FRAME_BUDGET_MS).sum()),
+            'stage_ms': {name: self._describe(samples[:, i]) for i, name in enumerate(STAGES)},
+            'worst_frame': {
+                'total_ms': round(float(totals[worst]), 3),
+                'slowest_stage': STAGES[int(samples[worst].argmax())],
+                'stage_ms': {name: round(float(samples[worst, i]), 3) for i, name in enumerate(STAGES)},
+            },
+            'peak_counts': {name: int(self.counts[:frames, i].max()) for i, name in enumerate(COUNTERS)},
+            'peak_budget_pressure': round(float(self.pressure[:frames].max()), 3),
+        }
+
+    def _describe(self, values):
+        """Get mean, p95 and max of a column of millisecond timings."""
+        return {
+            'mean': round(float(values.mean()), 3),
+            'p95': round(float(np.percentile(values, 95)), 3),
+            'max': round(float(values.max()), 3),
+        }
+
+    def toggle_overlay(self):
+        """Show or hide the overlay."""
+        self.overlay_visible = not self.overlay_visible
+        self.overlay_surface = None
+
+    def draw_overlay(self, screen):
+        """Draw the overlay in the top-left corner and return its rect, or None if hidden."""
+        if not self.overlay_visible:
+            return None
+
+        if self.overlay_surface is None or self.frame_count % self.overlay_refresh == 0:
+            self.overlay_surface = self.render_overlay()
+        return screen.blit(self.overlay_surface, (10, 10))
+
+    def render_overlay(self):
+        """Render the current summary as a translucent text panel."""
+        if self.font is None:
+            pygame.font.init()
+            self.font = pygame.font.SysFont("monospace", 14)
+
+        summary = self.get_summary()
+        lines = [("Profiler: waiting for frames", (255, 255, 255))]
+        if summary:
+            frame_ms = summary['frame_ms']
+            worst = summary['worst_frame']
+            counts = summary['peak_counts']
+            budget_color = (255, 120, 120) if frame_ms['p95'] > FRAME_BUDGET_MS else (140, 255, 140)
+            lines = [
+                (f"frame  mean {frame_ms['mean']:6.2f}  p95 {frame_ms['p95']:6.2f}  "
+                 f"max {frame_ms['max']:6.2f} ms", budget_color),
+                (f"over budget {summary['over_budget']}/{summary['frames']}  "
+                 f"worst {worst['total_ms']:.1f} ms in {worst['slowest_stage']}", budget_color),
+            ]
+            for name, stats in summary['stage_ms'].items():
+                color = (255, 200, 120) if name == worst['slowest_stage'] else (255, 255, 255)
+                lines.append((f"{name:<17}{stats['mean']:6.2f} {stats['p95']:6.2f} {stats['max']:6.2f}", color))
+            lines.append((f"shapes {counts['shapes']}  particles {counts['particles']}  "
+                          f"tail {counts['tail_points']}  "
+                          f"budget {summary['peak_budget_pressure']:.0%}", (200, 200, 255)))
+
+        rendered = [self.font.render(text, True, color) for text, color in lines]
+        line_height = self.font.get_linesize()
+        width = max(surface.get_width() for surface in rendered) + 16
+        panel = pygame.Surface((width, line_height * len(rendered) + 12), pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 180))
+        for i, surface in enumerate(rendered):
+            panel.blit(surface, (8, 6 + i * line_height))
+        return panel
+
+    def write_trace(self, path):
+        """Write the recorded frames as Chrome trace-event JSON."""
+        events = [{"name": "thread_name", "ph": "M", "pid": 1, "tid": 1, "args": {"name": "game loop"}}]
+        frames = min(self.frame_count, self.trace_frames)
+        first = self.frame_count - frames
+        for frame in range(first, self.frame_count):
+            row = frame % self.trace_frames
+            starts = self.trace_starts[row].tolist()
+            durations = self.trace_durations[row].tolist()
+            for name, start, duration in zip(STAGES, starts, durations):
+                if start == start:  # Not NaN, so the stage was marked
+                    events.append({"name": name, "cat": "stage", "ph": "X", "pid": 1, "tid": 1,
+                                   "ts": round(start, 1), "dur": round(duration, 1)})
+            start, duration = self.trace_spans[row].tolist()
+            events.append({"name": "frame", "cat": "frame", "ph": "X", "pid": 1, "tid": 1,
+                           "ts": round(start, 1), "dur": round(duration, 1)})
+            events.append({"name": "entities", "ph": "C", "pid": 1, "ts": round(start, 1),
+                           "args": dict(zip(COUNTERS, self.trace_counts[row].tolist()))})
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        return frames
@@ -0,0 +1,89 @@
+"""
+Quality Governor module for Baby Games
+Lowers visual quality when frames run over budget and raises it again
+when there is headroom.
+
+The governor only decides; its decisions are posted as QUALITY_CHANGED
+events so the game applies them at the start of a frame and session logs
+record them for exact replay.
+"""
+
+from collections import deque
+import pygame
+from game_log import logger
+
+# Quality settings from best to cheapest
+QUALITY_LEVELS = (
+    {'name': "high", 'particle_scale': 1.0, 'tail_layers': 3, 'bezier_steps': 10,
+     'tail_length': 35, 'scale_step': 0.05, 'shape_scale': 1.0},
+    {'name': "medium", 'particle_scale': 0.7, 'tail_layers': 3, 'bezier_steps': 6,
+     'tail_length': 30, 'scale_step': 0.1, 'shape_scale': 0.8},
+    {'name': "low", 'particle_scale': 0.45, 'tail_layers': 2, 'bezier_steps': 4,
+     'tail_length': 22, 'scale_step': 0.15, 'shape_scale': 0.6},
+    {'name': "minimal", 'particle_scale': 0.25, 'tail_layers': 1, 'bezier_steps': 2,
+     'tail_length': 12, 'scale_step': 0.25, 'shape_scale': 0.4},
+)
+
+QUALITY_NAMES = tuple(level['name'] for level in QUALITY_LEVELS)
+
+# Event carrying a new quality level in its 'level' attribute
+QUALITY_CHANGED = pygame.event.custom_type()
+
+
+class QualityGovernor:
+    def __init__(self, budget_ms=1000 / 60, level=0, downgrade_ratio=1.1, upgrade_ratio=0.6,
+                 downgrade_window=30, upgrade_window=180, cooldown=60):
+        """Initialize the governor.
+
+        Quality drops a level when the mean work time of the last
+        downgrade_window frames is over downgrade_ratio of the budget, and
+        rises a level when the mean of the last upgrade_window frames is
+        under upgrade_ratio of it. The gap between the two thresholds, the
+        longer upgrade window and the cooldown after each change keep it
+        from flip-flopping between levels.
+        """
+        self.budget_ms = budget_ms
+        self.level = level
+        self.downgrade_ms = budget_ms * downgrade_ratio
+        self.upgrade_ms = budget_ms * upgrade_ratio
+        self.downgrade_window = downgrade_window
+        self.cooldown = cooldown
+        self.samples = deque(maxlen=upgrade_window)
+        self.frames_since_change = 0
+        self.transitions = 0
+
+    def record(self, work_ms):
+        """Add one frame's work time and return a new level, or None to keep the current one."""
+        self.samples.append(work_ms)
+        self.frames_since_change += 1
+        if self.frames_since_change < self.cooldown or len(self.samples) < self.downgrade_window:
+            return None
+
+        recent = list(self.samples)[-self.downgrade_window:]
+        recent_ms = sum(recent) / len(recent)
+        if recent_ms > self.downgrade_ms and self.level < len(QUALITY_LEVELS) - 1:
+            return self._change(self.level + 1, recent_ms)
+
+        if len(self.samples) == self.samples.maxlen and self.level > 0:
+            long_ms = sum(self.samples) / len(self.samples)
+            if long_ms < self.upgrade_ms:
+                return self._change(self.level - 1, long_ms)
+        return None
+
+    def _change(self, level, measured_ms):
+        """Switch level, log it and start measuring afresh."""
+        direction = "📉 Lowering" if level > self.level else "📈 Raising"
+        logger.info("%s quality to %s (frames took %.1f ms of a %.1f ms budget)",
+                    direction, QUALITY_NAMES[level], measured_ms, self.budget_ms)
+        self.level = level
+        self.samples.clear()
+        self.frames_since_change = 0
+        self.transitions += 1
+        return level
+
+    def get_stats(self):
+        """Get the current level and how often it changed."""
+        return {
+            'level': QUALITY_NAMES[self.level],
+            'transitions': self.transitions,
+        }
@@ -0,0 +1,128 @@
+"""
+Render Backend module for Baby Games
+Draws through SDL's GPU renderer instead of blitting onto the display surface.
+
+A TextureScreen stands in for the display surface. Sprites are uploaded
+once as textures and the renderer rotates, scales and fades them as it
+draws, so there is no per-frame CPU transform or alpha blending in
+Python. Surfaces that change every frame (the mouse tail, the profiler
+overlay, animated shapes) are re-uploaded to streaming textures instead.
+"""
+
+import weakref
+import pygame
+from pygame._sdl2 import video
+
+BACKENDS = ("surface", "texture")
+
+
+class TextureScreen:
+    def __init__(self, size, fullscreen=False, title="Baby Games", accelerated=-1):
+        """Open a window with a renderer and clear it.
+
+        accelerated is 1 for a GPU renderer, 0 for SDL's software renderer
+        or -1 to prefer the GPU and fall back to software.
+        """
+        self.width, self.height = size
+        self.window = video.Window(title, size=size, fullscreen_desktop=fullscreen)
+        self.renderer = video.Renderer(self.window, accelerated=accelerated)
+
+        # Textures die with the cached surfaces they were uploaded from
+        self.textures = weakref.WeakKeyDictionary()
+        self.streams = weakref.WeakKeyDictionary()
+
+        # Statistics
+        self.uploads = 0
+        self.draws = 0
+
+    def get_size(self):
+        """Get the screen size."""
+        return (self.width, self.height)
+
+    def get_rect(self):
+        """Get the screen rect."""
+        return pygame.Rect(0, 0, self.width, self.height)
+
+    def fill(self, color, rect=None):
+        """Fill the screen, or part of it, with a color."""
+        self.renderer.draw_color = (*color[:3], 255)
+        if rect is None:
+            self.renderer.clear()
+        else:
+            self.renderer.fill_rect(rect)
+
+    def get_texture(self, surface):
+        """Get the texture for a surface that never changes, uploading it once."""
+        texture = self.textures.get(surface)
+        if texture is None:
+            texture = video.Texture.from_surface(self.renderer, surface)
+            texture.blend_mode = pygame.BLENDMODE_BLEND
+            self.textures[surface] = texture
+            self.uploads += 1
+        return texture
+
+    def get_stream(self, surface):
+        """Get the streaming texture for a surface that is redrawn between frames."""
+        texture = self.streams.get(surface)
+        if texture is None:
+            texture = video.Texture(self.renderer, surface.get_size(), streaming=True)
+            texture.blend_mode = pygame.BLENDMODE_BLEND
+            self.streams[surface] = texture
+        return texture
+
+    def draw_sprite(self, surface, center, angle=0.0, scale=1.0, alpha=255, changing=False):
+        """Draw a sprite centered on a point and return the rect it covers.
+
+        angle is counterclockwise in degrees, as for pygame.transform.rotate.
+        A changing sprite is uploaded again to its own streaming texture on
+        every draw; others are uploaded once.
+        """
+        if changing:
+            texture = self.get_stream(surface)
+            texture.update(surface)
+            self.uploads += 1
+        else:
+            texture = self.get_texture(surface)
+        width, height = surface.get_size()
+        rect = pygame.Rect(0, 0, max(1, round(width * scale)), max(1, round(height * scale)))
+        rect.center = center
+        texture.alpha = alpha
+        texture.draw(dstrect=rect, angle=-angle)
+        self.draws += 1
+        return rect
+
+    def draw_sprites(self, sprites):
+        """Draw (surface, center, angle, alpha) sprites and return the rects they cover."""
+        return [self.draw_sprite(surface, center, angle, 1.0, alpha)
+                for surface, center, angle, alpha in sprites]
+
+    def blit(self, surface, dest, area=None):
+        """Copy a surface that may have changed since the last frame and return the rect it covers."""
+        area = pygame.Rect(area) if area is not None else surface.get_rect()
+        rect = pygame.Rect(dest[0], dest[1], area.width, area.height)
+        if not area.width or not area.height:
+            return rect
+
+        texture = self.get_stream(surface)
+        texture.update(surface.subsurface(area), area)
+        texture.draw(srcrect=area, dstrect=rect)
+        self.uploads += 1
+        self.draws += 1
+        return rect
+
+    def blits(self, blit_sequence):
+        """Copy many (surface, dest) pairs and return the rects they cover."""
+        return [self.blit(surface, dest) for surface, dest in blit_sequence]
+
+    def present(self):
+        """Show the finished frame."""
+        self.renderer.present()
+
+    def get_stats(self):
+        """Get texture upload and draw counts."""
+        return {
+            'textures': len(self.textures),
+            'streams': len(self.streams),
+            'uploads': self.uploads,
+            'draws': self.draws,
+        }
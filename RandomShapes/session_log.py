@@ -0,0 +1,130 @@
+"""
+Session Log module for Baby Games
+Records play sessions to a compact binary log and plays them back.
+
+A log is a header followed by records. Every frame writes the events that
+happened during it and then a frame record, so a replay feeds the same
+events, mouse positions and frame times into the game in the same order.
+"""
+
+import struct
+import pygame
+from game_log import logger
+from quality_governor import QUALITY_CHANGED
+
+MAGIC = b"BGSL"
+VERSION = 2  # Version 2 added quality records
+
+# Seeds stored in the header, in order
+SEED_NAMES = ("shape_manager", "shapes", "particles", "animations")
+
+HEADER = struct.Struct("<4sBHH4Q")   # magic, version, width, height, seeds
+FRAME = struct.Struct("<BIfhh")       # tag, time ms, dt ms, mouse x, mouse y
+KEY = struct.Struct("<BIiH")          # tag, time ms, key, mod
+BUTTON = struct.Struct("<BIBhh")      # tag, time ms, button, x, y
+QUALITY = struct.Struct("<BIB")       # tag, time ms, quality level
+
+FRAME_TAG = ord("F")
+KEY_TAG = ord("K")
+BUTTON_TAG = ord("M")
+QUALITY_TAG = ord("Q")
+
+RECORDS = {FRAME_TAG: FRAME, KEY_TAG: KEY, BUTTON_TAG: BUTTON, QUALITY_TAG: QUALITY}
+
+# Frames between flushes, so a crash loses at most about a second of play
+FLUSH_FRAMES = 60
+
+
+class SessionRecorder:
+    def __init__(self, path, screen_size, seeds):
+        """Open a new session log and write its header."""
+        self.path = path
+        self.file = open(path, "wb")
+        self.time_ms = 0.0
+        self.frames = 0
+
+        width, height = screen_size
+        self.file.write(HEADER.pack(MAGIC, VERSION, width, height,
+                                    *(seeds[name] for name in SEED_NAMES)))
+
+    def record_frame(self, dt, mouse_pos, events):
+        """Write one frame: its input events, then its time step and mouse position."""
+        self.time_ms += dt
+        time_ms = int(self.time_ms)
+
+        for event in events:
+            if event.type == pygame.KEYDOWN:
+                self.file.write(KEY.pack(KEY_TAG, time_ms, event.key, event.mod))
+            elif event.type == pygame.MOUSEBUTTONDOWN:
+                x, y = event.pos
+                self.file.write(BUTTON.pack(BUTTON_TAG, time_ms, event.button, x, y))
+            elif event.type == QUALITY_CHANGED:
+                self.file.write(QUALITY.pack(QUALITY_TAG, time_ms, event.level))
+
+        x, y = mouse_pos
+        self.file.write(FRAME.pack(FRAME_TAG, time_ms, dt, int(x), int(y)))
+        self.frames += 1
+        if self.frames % FLUSH_FRAMES == 0:
+            self.file.flush()
+
+    def close(self):
+        """Flush and close the log."""
+        if not self.file.closed:
+            self.file.close()
+
+
+class SessionPlayer:
+    def __init__(self, path):
+        """Open a session log and read its header."""
+        self.path = path
+        with open(path, "rb") as f:
+            self.data = f.read()
+
+        if len(self.data) < HEADER.size:
+            raise ValueError(f"{path} is too short to be a session log")
+        magic, version, width, height, *seeds = HEADER.unpack_from(self.data)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a Baby Games session log")
+        if not 1 <= version <= VERSION:
+            raise ValueError(f"{path} has unsupported session log version {version}")
+
+        self.screen_size = (width, height)
+        self.seeds = dict(zip(SEED_NAMES, seeds))
+
+    def frames(self):
+        """Yield (dt, mouse_pos, events) for each recorded frame.
+
+        A log cut off partway through a record (e.g. by a crash) is played
+        up to the last whole frame.
+        """
+        data = self.data
+        offset = HEADER.size
+        events = []
+
+        while offset < len(data):
+            tag = data[offset]
+            record = RECORDS.get(tag)
+            if record is None:
+                raise ValueError(f"{self.path} has an unknown record at byte {offset}")
+            if offset + record.size > len(data):
+                logger.warning("⚠️  %s ends partway through a record at byte %d; stopping the replay there",
+                               self.path, offset)
+                return
+
+            if tag == FRAME_TAG:
+                _, _, dt, x, y = FRAME.unpack_from(data, offset)
+                offset += FRAME.size
+                yield dt, (x, y), events
+                events = []
+            elif tag == KEY_TAG:
+                _, _, key, mod = KEY.unpack_from(data, offset)
+                offset += KEY.size
+                events.append(pygame.event.Event(pygame.KEYDOWN, key=key, mod=mod))
+            elif tag == BUTTON_TAG:
+                _, _, button, x, y = BUTTON.unpack_from(data, offset)
+                offset += BUTTON.size
+                events.append(pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=button, pos=(x, y)))
+            else:
+                _, _, level = QUALITY.unpack_from(data, offset)
+                offset += QUALITY.size
+                events.append(pygame.event.Event(QUALITY_CHANGED, level=level))
@@ -5,121 +5,199 @@ Handles shape creation, management, and lifecycle.
 
 import random
 import math
-import pygame
-from shapes import Shape
+import logging
+from collections import deque
+import game_clock
+import game_log
+from shapes import sprite_cache
+from shape_store import ShapeStore
+from shape_pool import ShapePool
 from input_handler import InputHandler
 from sound_manager import SoundManager
 from particle_system import ParticleSystem
 from mouse_tail import MouseTail
+from spatial_hash import SpatialHash
+from entity_budget import EntityBudget, PRIORITY_EFFECT, PRIORITY_KEY
 
 
 class ShapeManager:
-    def __init__(self):
-        """Initialize the shape manager."""
-        self.shapes = []
+    def __init__(self, sound_manager=None, seed=None, particle_seed=None, max_shapes=10,
+                 budget=None):
+        """Initialize the shape manager.
+        
+        seed drives shape placement and mouse effects; particle_seed drives
+        the pop effects. max_shapes limits shapes made from key presses, and
+        budget (an EntityBudget) caps all shapes and pop particles together.
+        """
+        self.rng = random.Random(seed)
+        self.budget = budget if budget is not None else EntityBudget()
+        self.shapes = {}  # Shape -> draw index, in draw order
+        self.next_draw_index = 0
+        self.shape_queues = (deque(), deque())  # Creation order, per priority
+        self.shape_store = ShapeStore()
+        self.shape_pool = ShapePool(self.shape_store)
         self.input_handler = InputHandler()
-        self.sound_manager = SoundManager()
-        self.particle_system = ParticleSystem()
+        self.sound_manager = sound_manager if sound_manager is not None else SoundManager()
+        self.particle_system = ParticleSystem(seed=particle_seed, budget=self.budget)
         self.mouse_tail = MouseTail(max_length=35)
-        self.max_shapes = 10  # Limit to 10 shapes as requested
+        self.spatial_index = SpatialHash(cell_size=128)
+        self.max_shapes = max_shapes  # 10 by default; hundreds in party mode
+        self.particle_scale = 1.0  # Fraction of pop particles kept, lowered by the quality governor
         self.shape_lifetime = 10000  # 10 seconds in milliseconds
         self.screen_width = 1920  # Default, will be updated
         self.screen_height = 1080  # Default, will be updated
         
+        self.budget.track('shapes', self.get_shape_count)
+        
+    def apply_quality(self, settings):
+        """Apply a quality level from the quality governor."""
+        self.particle_scale = settings['particle_scale']
+        self.mouse_tail.layers = settings['tail_layers']
+        self.mouse_tail.set_bezier_steps(settings['bezier_steps'])
+        self.mouse_tail.set_max_length(settings['tail_length'])
+        sprite_cache.set_scale_step(settings['scale_step'])
+        self.budget.set_limit_scale('shapes', settings['shape_scale'])
+        
     def set_screen_bounds(self, width, height):
         """Set the screen bounds for shape positioning."""
         self.screen_width = width
         self.screen_height = height
         
+    def new_shape(self, shape_type, color_name, x, y, size=50):
+        """Get a shape from the pool, with its motion state in this manager's store."""
+        return self.shape_pool.acquire(shape_type, color_name, x, y, size)
+    
     def create_shape_from_key(self, key):
-        """Create a new shape based on the pressed key."""
+        """Create a new shape based on the pressed key, or return None if the budget is full."""
         # Get shape type and color from input handler
         shape_type = self.input_handler.get_shape_type(key)
         available_colors = self.input_handler.get_available_colors(key)
-        color_name = random.choice(available_colors)
+        color_name = self.rng.choice(available_colors)
         
         # Get random position (avoid edges)
         margin = 100
-        x = random.randint(margin, self.screen_width - margin)
-        y = random.randint(margin, self.screen_height - margin)
+        x = self.rng.randint(margin, self.screen_width - margin)
+        y = self.rng.randint(margin, self.screen_height - margin)
         
         # Random size between 30 and 100
-        size = random.randint(30, 100)
+        size = self.rng.randint(30, 100)
         
         # Create the shape
-        shape = Shape(shape_type, color_name, x, y, size)
+        shape = self.new_shape(shape_type, color_name, x, y, size)
         
-        # Check if we need to remove the oldest shape before adding new one
-        if len(self.shapes) >= self.max_shapes:
-            print(f"🎯 Shape limit reached ({self.max_shapes})! Removing oldest shape...")
-            self.remove_oldest_shape_with_pop()
+        # Check if we need to remove the oldest key shape before adding new one
+        if len(self.shape_queues[PRIORITY_KEY]) >= self.max_shapes:
+            game_log.tally(logging.DEBUG, "🎯 Shape limit reached (%d)! Removing oldest shape...", self.max_shapes)
+            self.remove_oldest_shape_with_pop(PRIORITY_KEY)
         
-        # Add to shapes list
-        self.shapes.append(shape)
+        # Add to shapes list, making room within the budget if needed
+        if not self.add_shapes([shape], PRIORITY_KEY):
+            return None  # Over budget; the shape is already back in the pool
         
         # Debug info
-        print(f"✨ Created {shape.shape_type} with color {shape.color_name}! Total shapes: {len(self.shapes)}")
+        game_log.tally(logging.DEBUG, "✨ Created %s with color %s!", shape.shape_type, shape.color_name)
         
-        # Play a baby-friendly sound
-        self.sound_manager.play_shape_sound()
+        # Play a baby-friendly sound from the shape's side of the screen
+        self.sound_manager.play_shape_sound(self.get_pan(shape.x))
         
         return shape
     
-    def remove_oldest_shape_with_pop(self):
-        """Remove the oldest shape with a popping animation."""
-        if not self.shapes:
-            return
-            
-        # Find the oldest shape
-        oldest_shape = min(self.shapes, key=lambda s: s.creation_time)
+    def add_shapes(self, shapes, priority):
+        """Add new shapes if the budget allows and return the ones added.
         
-        # Create popping effect at the shape's position
-        self.particle_system.create_pop_effect(
-            oldest_shape.x, 
-            oldest_shape.y, 
-            oldest_shape.color,
-            num_particles=20
-        )
+        To make room, the oldest shapes of the same or lower priority are
+        popped. New shapes that still don't fit go back to the pool.
+        """
+        evictable = sum(len(queue) for queue in self.shape_queues[:priority + 1])
+        admitted, evict = self.budget.admit('shapes', len(shapes), evictable)
+        for _ in range(evict):
+            self.pop_shape(self.get_oldest_shape(priority), num_particles=10)
         
-        # Remove the oldest shape
-        self.shapes.remove(oldest_shape)
+        for shape in shapes[admitted:]:
+            self.shape_pool.release(shape)
+        if admitted < len(shapes):
+            game_log.tally(logging.INFO, "🚦 Shape budget full! Skipped %d shapes", len(shapes) - admitted)
+        
+        queue = self.shape_queues[priority]
+        for shape in shapes[:admitted]:
+            shape.priority = priority
+            self.shapes[shape] = self.next_draw_index
+            self.next_draw_index += 1
+            queue.append(shape)
+            # Index it now, so it can be clicked before the next step
+            self.spatial_index.insert(shape, shape.x, shape.y, shape.get_radius())
+        return shapes[:admitted]
+    
+    def get_oldest_shape(self, max_priority=PRIORITY_KEY):
+        """Get the oldest shape, preferring the lowest priority, or None."""
+        for queue in self.shape_queues[:max_priority + 1]:
+            if queue:
+                return queue[0]
+        return None
+    
+    def remove_oldest_shape_with_pop(self, priority=None):
+        """Remove the oldest shape (of one priority, if given) with a popping animation."""
+        if priority is None:
+            # The oldest of each queue's first shape
+            fronts = [queue[0] for queue in self.shape_queues if queue]
+            oldest_shape = min(fronts, key=lambda s: s.creation_time) if fronts else None
+        else:
+            queue = self.shape_queues[priority]
+            oldest_shape = queue[0] if queue else None
+        if oldest_shape is None:
+            return
         
         # Debug info
-        print(f"💥 Popped oldest {oldest_shape.shape_type} at ({oldest_shape.x:.0f}, {oldest_shape.y:.0f})! Shapes remaining: {len(self.shapes)}")
+        game_log.tally(logging.DEBUG, "💥 Popped oldest %s!", oldest_shape.shape_type)
+        
+        # Pop the oldest shape
+        self.pop_shape(oldest_shape, num_particles=20)
         
         # Play a pop sound (if available)
         # self.sound_manager.play_pop_sound()  # Uncomment if you add this method
     
+    def pop_shape(self, shape, num_particles=15):
+        """Remove a shape with a popping animation and return it to the pool."""
+        self.particle_system.create_pop_effect(
+            shape.x, 
+            shape.y, 
+            shape.color,
+            num_particles=max(1, round(num_particles * self.particle_scale))
+        )
+        del self.shapes[shape]
+        queue = self.shape_queues[shape.priority]
+        if queue[0] is shape:
+            queue.popleft()
+        else:
+            queue.remove(shape)
+        self.spatial_index.remove(shape)
+        self.shape_pool.release(shape)
+    
     def cleanup_old_shapes(self):
         """Remove shapes that are too old."""
-        current_time = pygame.time.get_ticks()
-        
-        # Remove shapes older than lifetime
-        shapes_to_remove = []
-        for shape in self.shapes:
-            if current_time - shape.creation_time >= self.shape_lifetime:
-                shapes_to_remove.append(shape)
+        current_time = game_clock.get_ticks()
         
-        # Remove old shapes with pop effect
-        for shape in shapes_to_remove:
-            self.particle_system.create_pop_effect(
-                shape.x, 
-                shape.y, 
-                shape.color,
-                num_particles=15
-            )
-            self.shapes.remove(shape)
+        # Queues are in creation order, so expired shapes are at the front
+        for queue in self.shape_queues:
+            while queue and current_time - queue[0].creation_time >= self.shape_lifetime:
+                self.pop_shape(queue[0], num_particles=15)
+    
+    def begin_frame(self):
+        """Start a new rendered frame."""
+        self.sound_manager.begin_frame()
     
     def update(self):
-        """Update all shapes and particles."""
-        for shape in self.shapes:
-            shape.update()
-            
-            # Bounce off screen edges using actual screen dimensions
-            if shape.x <= 0 or shape.x >= self.screen_width:
-                shape.velocity_x *= -1
-            if shape.y <= 0 or shape.y >= self.screen_height:
-                shape.velocity_y *= -1
+        """Advance all shapes and particles by one simulation step."""
+        # Move every shape and bounce off screen edges in one vectorized step
+        store = self.shape_store
+        store.step(self.screen_width, self.screen_height)
+        
+        if self.shapes:
+            rows = [shape.row for shape in self.shapes]
+            self.spatial_index.update_many(self.shapes, store.x[rows], store.y[rows], store.radius[rows])
+        
+        # Bounce shapes off each other
+        self.resolve_collisions()
         
         # Update particle system
         self.particle_system.update()
@@ -127,18 +205,75 @@ class ShapeManager:
         # Clean up old shapes
         self.cleanup_old_shapes()
     
-    def draw(self, screen):
-        """Draw all shapes and particles."""
+    def resolve_collisions(self):
+        """Bounce apart shapes that overlap, using the spatial index to find them."""
+        pushed = {}  # Insertion-ordered, so replays re-index in the same order
+        for a, b in self.spatial_index.overlapping_pairs():
+            dx = b.x - a.x
+            dy = b.y - a.y
+            distance = math.hypot(dx, dy)
+            radius_a = a.get_radius()
+            radius_b = b.get_radius()
+            
+            # Leave nested shapes alone so rings and expanding circles keep their pattern
+            if distance <= abs(radius_a - radius_b):
+                continue
+            nx = dx / distance
+            ny = dy / distance
+            
+            # Equal masses: swap the velocity along the normal if they're approaching
+            approach = (a.velocity_x - b.velocity_x) * nx + (a.velocity_y - b.velocity_y) * ny
+            if approach > 0:
+                a.velocity_x -= approach * nx
+                a.velocity_y -= approach * ny
+                b.velocity_x += approach * nx
+                b.velocity_y += approach * ny
+            
+            # Push them apart so they don't stay stuck together
+            push = (radius_a + radius_b - distance) / 2
+            a.x -= nx * push
+            a.y -= ny * push
+            b.x += nx * push
+            b.y += ny * push
+            pushed[a] = pushed[b] = None
+        
+        # Keep hit testing in step with where the pushes left the shapes
+        for shape in pushed:
+            self.spatial_index.update(shape, shape.x, shape.y, shape.get_radius())
+    
+    def get_shape_at(self, x, y):
+        """Get the topmost shape under a point, or None."""
+        hits = self.spatial_index.query_point(x, y)
+        if not hits:
+            return None
+        # Shapes added later are drawn on top
+        return max(hits, key=self.shapes.__getitem__)
+    
+    def draw(self, screen, alpha=1.0):
+        """Draw all shapes and particles and return the screen rects they cover.
+        
+        alpha interpolates between the last two simulation steps.
+        """
+        rects = []
+        
         # Draw shapes first
         for shape in self.shapes:
-            shape.draw(screen)
+            rect = shape.draw(screen, alpha)
+            if rect is not None:
+                rects.append(rect)
         
         # Draw particles on top
-        self.particle_system.draw(screen)
+        rects.extend(self.particle_system.draw(screen, alpha))
+        return rects
     
     def clear_all(self):
         """Clear all shapes and particles."""
+        for shape in self.shapes:
+            self.shape_pool.release(shape)
         self.shapes.clear()
+        for queue in self.shape_queues:
+            queue.clear()
+        self.spatial_index.clear()
         self.particle_system.clear_all()
     
     def get_shape_count(self):
@@ -149,11 +284,34 @@ class ShapeManager:
         """Get the current number of particles."""
         return self.particle_system.get_particle_count()
     
+    def get_budget_stats(self):
+        """Get live counts, limits, pressure and shed totals for every budgeted kind."""
+        return self.budget.get_stats()
+    
+    def get_pool_stats(self):
+        """Get shape pool and pop particle storage statistics, including high-water marks."""
+        return {
+            'shapes': self.shape_pool.get_stats(),
+            'particles': self.particle_system.get_pool_stats(),
+        }
+    
+    def get_sprite_cache_stats(self):
+        """Get hit/miss/eviction counts and memory use of the sprite cache."""
+        return sprite_cache.get_stats()
+    
     def handle_mouse_action(self, button, mouse_pos):
         """Handle mouse button actions."""
         action = self.input_handler.get_mouse_action(button)
         x, y = mouse_pos
         
+        # Clicking a shape pops it instead
+        shape = self.get_shape_at(x, y)
+        if shape is not None:
+            game_log.tally(logging.DEBUG, "💥 Popped %s!", shape.shape_type)
+            self.pop_shape(shape, num_particles=20)
+            self.sound_manager.play_shape_sound(self.get_pan(x))
+            return
+        
         if action == "rainbow_trail":
             self.create_rainbow_trail_effect(x, y)
         elif action == "middle_click":
@@ -170,65 +328,80 @@ class ShapeManager:
             self.create_cosmic_portal(x, y)
         
         # Play sound for any mouse action
-        self.sound_manager.play_shape_sound()
+        self.sound_manager.play_shape_sound(self.get_pan(x))
+    
+    def get_pan(self, x):
+        """Get the stereo pan (0.0 left to 1.0 right) for a screen x position."""
+        return max(0.0, min(1.0, x / self.screen_width))
     
     def create_rainbow_trail_effect(self, x, y):
         """Create a rainbow trail effect at the given position."""
+        shapes = []
         colors = ["red", "orange", "yellow", "green", "blue", "purple"]
         for i, color in enumerate(colors):
             # Create shapes in a trail pattern
             trail_x = x + i * 20
             trail_y = y + i * 10
-            shape = Shape("circle", color, trail_x, trail_y, 20 + i * 5)
-            self.shapes.append(shape)
-            print(f"🌈 Created rainbow trail shape {i+1}!")
+            shape = self.new_shape("circle", color, trail_x, trail_y, 20 + i * 5)
+            shapes.append(shape)
+            game_log.tally(logging.DEBUG, "🌈 Created rainbow trail shape!")
+        self.add_shapes(shapes, PRIORITY_EFFECT)
     
     def create_expanding_circles(self, x, y):
         """Create expanding circles from the mouse position."""
+        shapes = []
         for i in range(5):
             size = 30 + i * 15
-            shape = Shape("circle", "cyan", x, y, size)
+            shape = self.new_shape("circle", "cyan", x, y, size)
             shape.velocity_x = 0  # Keep circles centered
             shape.velocity_y = 0
-            self.shapes.append(shape)
-            print(f"⭕ Created expanding circle {i+1}!")
+            shapes.append(shape)
+            game_log.tally(logging.DEBUG, "⭕ Created expanding circle!")
+        self.add_shapes(shapes, PRIORITY_EFFECT)
     
     def create_star_burst(self, x, y):
         """Create a star burst explosion."""
+        shapes = []
         for i in range(8):
             angle = i * 45  # 8 directions
             distance = 50
             star_x = x + distance * math.cos(math.radians(angle))
             star_y = y + distance * math.sin(math.radians(angle))
-            shape = Shape("star", "gold", star_x, star_y, 25)
-            self.shapes.append(shape)
-            print(f"⭐ Created star burst {i+1}!")
+            shape = self.new_shape("star", "gold", star_x, star_y, 25)
+            shapes.append(shape)
+            game_log.tally(logging.DEBUG, "⭐ Created star burst shape!")
+        self.add_shapes(shapes, PRIORITY_EFFECT)
     
     def create_spiral_effect(self, x, y):
         """Create a spiral effect around the mouse position."""
+        shapes = []
         for i in range(12):
             angle = i * 30
             radius = 20 + i * 8
             spiral_x = x + radius * math.cos(math.radians(angle))
             spiral_y = y + radius * math.sin(math.radians(angle))
-            shape = Shape("spiral", "magenta", spiral_x, spiral_y, 20)
-            self.shapes.append(shape)
-            print(f"🌀 Created spiral effect {i+1}!")
+            shape = self.new_shape("spiral", "magenta", spiral_x, spiral_y, 20)
+            shapes.append(shape)
+            game_log.tally(logging.DEBUG, "🌀 Created spiral effect shape!")
+        self.add_shapes(shapes, PRIORITY_EFFECT)
     
     def create_fireworks(self, x, y):
         """Create fireworks effect at the mouse position."""
+        shapes = []
         colors = ["red", "blue", "green", "yellow", "purple", "orange"]
         for i in range(10):
             # Random position around the center
-            offset_x = random.randint(-30, 30)
-            offset_y = random.randint(-30, 30)
-            color = random.choice(colors)
-            shape = Shape("fireworks", color, x + offset_x, y + offset_y, 15)
-            self.shapes.append(shape)
-            print(f"🎆 Created firework {i+1}!")
+            offset_x = self.rng.randint(-30, 30)
+            offset_y = self.rng.randint(-30, 30)
+            color = self.rng.choice(colors)
+            shape = self.new_shape("fireworks", color, x + offset_x, y + offset_y, 15)
+            shapes.append(shape)
+            game_log.tally(logging.DEBUG, "🎆 Created firework!")
+        self.add_shapes(shapes, PRIORITY_EFFECT)
     
     def create_butterfly_swarm(self, x, y):
         """Create a beautiful butterfly swarm effect."""
+        shapes = []
         colors = ["pink", "purple", "cyan", "yellow", "orange", "magenta"]
         for i in range(8):
             # Create butterflies in a circular pattern
@@ -236,13 +409,15 @@ class ShapeManager:
             distance = 40 + i * 10
             butterfly_x = x + distance * math.cos(math.radians(angle))
             butterfly_y = y + distance * math.sin(math.radians(angle))
-            color = random.choice(colors)
-            shape = Shape("butterfly", color, butterfly_x, butterfly_y, 25)
-            self.shapes.append(shape)
-            print(f"🦋 Created butterfly {i+1}!")
+            color = self.rng.choice(colors)
+            shape = self.new_shape("butterfly", color, butterfly_x, butterfly_y, 25)
+            shapes.append(shape)
+            game_log.tally(logging.DEBUG, "🦋 Created butterfly!")
+        self.add_shapes(shapes, PRIORITY_EFFECT)
     
     def create_cosmic_portal(self, x, y):
         """Create a cosmic portal effect."""
+        shapes = []
         portal_colors = ["cosmic", "neon", "crystal", "shimmer", "metallic"]
         for i in range(6):
             # Create portal rings
@@ -252,17 +427,24 @@ class ShapeManager:
                 portal_x = x + ring_radius * math.cos(math.radians(angle))
                 portal_y = y + ring_radius * math.sin(math.radians(angle))
                 color = portal_colors[i % len(portal_colors)]
-                shape = Shape("spiral", color, portal_x, portal_y, 20 - i * 2)
-                self.shapes.append(shape)
-            print(f"🌀 Created cosmic portal ring {i+1}!")
+                shape = self.new_shape("spiral", color, portal_x, portal_y, 20 - i * 2)
+                shapes.append(shape)
+                game_log.tally(logging.DEBUG, "🌀 Created cosmic portal shape!")
+        self.add_shapes(shapes, PRIORITY_EFFECT)
     
     def update_mouse_tail(self, mouse_pos, dt):
         """Update the mouse tail with current mouse position."""
         self.mouse_tail.update(mouse_pos, dt)
     
+    def get_tail_length(self):
+        """Get the number of points in the mouse tail."""
+        return self.mouse_tail.count
+    
     def draw_mouse_tail(self, screen):
-        """Draw the mouse tail."""
+        """Draw the mouse tail and return the screen rects it covers."""
         self.mouse_tail.draw(screen)
+        rect = self.mouse_tail.get_dirty_rect()
+        return [rect] if rect is not None else []
     
     def cleanup(self):
         """Clean up resources."""
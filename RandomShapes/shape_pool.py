@@ -0,0 +1,57 @@
+"""
+Shape Pool module for Baby Games
+Recycles Shape objects so bursts of new shapes don't allocate.
+"""
+
+from shapes import Shape
+
+
+class ShapePool:
+    def __init__(self, store):
+        """Initialize the pool.
+
+        Released shapes go on a free list and are reset for the next
+        acquire; their store rows are freed and reused the same way.
+        """
+        self.store = store
+        self.free = []
+
+        # Statistics
+        self.in_use = 0
+        self.created = 0
+        self.reused = 0
+        self.peak_in_use = 0
+        self.peak_free = 0
+
+    def acquire(self, shape_type, color_name, x, y, size=50):
+        """Get a shape set up as new, reusing a released one if possible."""
+        if self.free:
+            shape = self.free.pop()
+            shape.reset(shape_type, color_name, x, y, size)
+            self.reused += 1
+        else:
+            shape = Shape(shape_type, color_name, x, y, size, store=self.store)
+            self.created += 1
+
+        self.in_use += 1
+        self.peak_in_use = max(self.peak_in_use, self.in_use)
+        return shape
+
+    def release(self, shape):
+        """Return a shape that is no longer on screen."""
+        shape.release()
+        self.free.append(shape)
+        self.in_use -= 1
+        self.peak_free = max(self.peak_free, len(self.free))
+
+    def get_stats(self):
+        """Get pool statistics, including high-water marks."""
+        return {
+            'in_use': self.in_use,
+            'free': len(self.free),
+            'created': self.created,
+            'reused': self.reused,
+            'peak_in_use': self.peak_in_use,
+            'peak_free': self.peak_free,
+            'store_capacity': self.store.capacity,
+        }
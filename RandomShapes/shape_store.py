@@ -0,0 +1,115 @@
+"""
+Shape Store module for Baby Games
+Keeps the motion state of every shape in contiguous NumPy arrays.
+
+Each Shape owns one row of the store and reads and writes its position,
+velocity, angle and scale through it, so one vectorized step moves every
+shape at once.
+"""
+
+import numpy as np
+
+# Per-shape columns, all float64
+FIELDS = (
+    "x", "y", "prev_x", "prev_y",
+    "velocity_x", "velocity_y",
+    "angle", "prev_angle", "rotation_speed",
+    "scale", "prev_scale", "scale_speed",
+    "size", "radius",
+)
+
+MIN_SCALE = 0.1
+MAX_SCALE = 3.0
+
+
+class ShapeStore:
+    def __init__(self, capacity=64):
+        """Initialize the store.
+
+        Rows are handed out from a free list and returned when a shape is
+        removed; capacity doubles when every row is in use.
+        """
+        self.capacity = 0
+        self.active = np.zeros(0, dtype=bool)
+        for name in FIELDS:
+            setattr(self, name, np.zeros(0))
+        self.free_rows = []
+        self._grow(capacity)
+
+    def _grow(self, capacity):
+        """Reallocate every column with room for capacity rows."""
+        old_capacity = self.capacity
+        for name in FIELDS + ("active",):
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:old_capacity] = old
+            setattr(self, name, new)
+
+        # Hand out low rows first so active rows stay packed
+        self.free_rows.extend(range(capacity - 1, old_capacity - 1, -1))
+        self.capacity = capacity
+
+    def allocate(self):
+        """Take a free row for a new shape."""
+        if not self.free_rows:
+            self._grow(self.capacity * 2)
+        row = self.free_rows.pop()
+        self.active[row] = True
+        return row
+
+    def release(self, row):
+        """Return a shape's row to the free list."""
+        if self.active[row]:
+            self.active[row] = False
+            self.free_rows.append(row)
+
+    def step(self, width, height):
+        """Advance every active shape by one simulation step.
+
+        Moves, rotates and scales each shape, clamps its scale and reverses
+        its velocity when it reaches a screen edge. Also refreshes the
+        radius column used for collisions.
+        """
+        rows = np.flatnonzero(self.active)
+        if len(rows) == 0:
+            return
+
+        x = self.x[rows]
+        y = self.y[rows]
+        angle = self.angle[rows]
+        scale = self.scale[rows]
+        velocity_x = self.velocity_x[rows]
+        velocity_y = self.velocity_y[rows]
+
+        self.prev_x[rows] = x
+        self.prev_y[rows] = y
+        self.prev_angle[rows] = angle
+        self.prev_scale[rows] = scale
+
+        x += velocity_x
+        y += velocity_y
+        angle += self.rotation_speed[rows]
+        scale *= self.scale_speed[rows]
+        np.clip(scale, MIN_SCALE, MAX_SCALE, out=scale)
+
+        # Bounce off screen edges
+        velocity_x[(x <= 0) | (x >= width)] *= -1
+        velocity_y[(y <= 0) | (y >= height)] *= -1
+
+        self.x[rows] = x
+        self.y[rows] = y
+        self.angle[rows] = angle
+        self.scale[rows] = scale
+        # Sprites are 2 * size across, so larger scales are clipped
+        self.radius[rows] = self.size[rows] * np.minimum(scale, 1.0)
+        self.velocity_x[rows] = velocity_x
+        self.velocity_y[rows] = velocity_y
+
+    def get_active_count(self):
+        """Get the number of rows in use."""
+        return self.capacity - len(self.free_rows)
+
+    def clear(self):
+        """Free every row."""
+        self.active[:] = False
+        self.free_rows = list(range(self.capacity - 1, -1, -1))
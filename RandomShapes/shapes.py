@@ -6,92 +6,185 @@ Defines different shape types and their properties.
 import pygame
 import random
 import math
+import game_clock
+import geometry
+from sprite_cache import SpriteCache
+from shape_store import ShapeStore
+from render_backend import TextureScreen
+
+# Shapes whose drawing is animated, so their sprites can't be reused
+UNCACHEABLE_SHAPES = {"shimmer"}
+
+# Shapes drawn from one of geometry.PATTERN_VARIANTS random layouts
+PATTERN_SHAPES = {"dots", "lines"}
+
+# Shared cache of rendered shape sprites
+sprite_cache = SpriteCache()
+
+# Shared array storage for shape motion
+shape_store = ShapeStore()
+
+# Random source for shape motion and colors, seeded for repeatable sessions
+rng = random.Random()
+
+
+def seed(value):
+    """Seed the random source used for new shapes."""
+    rng.seed(value)
+
+
+def store_field(name):
+    """Make a property that reads and writes the shape's row of a ShapeStore column."""
+    def get(self):
+        return getattr(self.store, name)[self.row]
+    
+    def set(self, value):
+        getattr(self.store, name)[self.row] = value
+    
+    return property(get, set)
+
+
+# RGB values for every color name, built once
+COLOR_PALETTE = {
+    # Basic colors
+    "red": (255, 0, 0),
+    "blue": (0, 0, 255),
+    "green": (0, 255, 0),
+    "yellow": (255, 255, 0),
+    "purple": (128, 0, 128),
+    "orange": (255, 165, 0),
+    "pink": (255, 192, 203),
+    "cyan": (0, 255, 255),
+    
+    # Number colors
+    "gold": (255, 215, 0),
+    "silver": (192, 192, 192),
+    "bronze": (205, 127, 50),
+    "emerald": (0, 128, 0),
+    "ruby": (155, 17, 30),
+    "sapphire": (15, 82, 186),
+    "amethyst": (153, 102, 204),
+    "topaz": (255, 200, 124),
+    
+    # Special colors ("rainbow" picks from RAINBOW_COLORS)
+    "neon": (0, 255, 255),
+    "pastel": (255, 182, 193),
+    "metallic": (169, 169, 169),
+    "glow": (255, 255, 224),
+    "sparkle": (255, 255, 255),
+    "shimmer": (240, 248, 255),
+    "crystal": (176, 196, 222),
+    
+    # Arrow colors
+    "electric": (0, 255, 255),
+    "fire": (255, 69, 0),
+    "ice": (173, 216, 230),
+    "earth": (139, 69, 19),
+    "wind": (240, 248, 255),
+    "light": (255, 255, 224),
+    "dark": (47, 79, 79),
+    "cosmic": (138, 43, 226),
+}
+
+RAINBOW_COLORS = (
+    (255, 0, 0),    # Red
+    (255, 127, 0),  # Orange
+    (255, 255, 0),  # Yellow
+    (0, 255, 0),    # Green
+    (0, 0, 255),    # Blue
+    (75, 0, 130),   # Indigo
+    (148, 0, 211),  # Violet
+)
 
 
 class Shape:
-    def __init__(self, shape_type, color_name, x, y, size=50):
-        """Initialize a shape with type, color, position, and size."""
+    __slots__ = ("store", "row", "shape_type", "color_name", "size", "alpha",
+                 "visible", "creation_time", "color", "pattern", "priority", "scratch_surface")
+    
+    def __init__(self, shape_type, color_name, x, y, size=50, store=None):
+        """Initialize a shape with type, color, position, and size.
+        
+        Motion state lives in a row of store (the shared shape_store by
+        default); call release when the shape is removed.
+        """
+        self.store = store if store is not None else shape_store
+        self.scratch_surface = None  # Redrawn every frame for uncacheable shapes
+        self.reset(shape_type, color_name, x, y, size)
+    
+    def reset(self, shape_type, color_name, x, y, size=50):
+        """Set up the shape as new, taking a row in its store."""
+        self.row = self.store.allocate()
+        
         self.shape_type = shape_type
         self.color_name = color_name
         self.x = x
         self.y = y
         self.size = size
+        self.store.size[self.row] = size
+        self.store.radius[self.row] = size
         self.angle = 0
         self.scale = 1.0
         self.alpha = 255
         self.visible = True
-        self.creation_time = pygame.time.get_ticks()
+        self.creation_time = game_clock.get_ticks()
+        self.priority = 0  # Spawn priority, set by ShapeManager
+        
+        # State before the last update, for interpolated drawing
+        self.prev_x = x
+        self.prev_y = y
+        self.prev_angle = 0
+        self.prev_scale = 1.0
         
         # Animation properties
-        self.velocity_x = random.uniform(-3, 3)
-        self.velocity_y = random.uniform(-3, 3)
-        self.rotation_speed = random.uniform(-5, 5)
-        self.scale_speed = random.uniform(0.95, 1.05)
+        self.velocity_x = rng.uniform(-3, 3)
+        self.velocity_y = rng.uniform(-3, 3)
+        self.rotation_speed = rng.uniform(-5, 5)
+        self.scale_speed = rng.uniform(0.95, 1.05)
         
         # Get the actual color
         self.color = self.get_color_from_name(color_name)
+        
+        # Pick a fixed random layout, so the sprite is stable and cacheable
+        self.pattern = rng.randrange(geometry.PATTERN_VARIANTS) if shape_type in PATTERN_SHAPES else 0
     
     def get_color_from_name(self, color_name):
         """Convert color name to RGB tuple."""
-        color_map = {
-            # Basic colors
-            "red": (255, 0, 0),
-            "blue": (0, 0, 255),
-            "green": (0, 255, 0),
-            "yellow": (255, 255, 0),
-            "purple": (128, 0, 128),
-            "orange": (255, 165, 0),
-            "pink": (255, 192, 203),
-            "cyan": (0, 255, 255),
-            
-            # Number colors
-            "gold": (255, 215, 0),
-            "silver": (192, 192, 192),
-            "bronze": (205, 127, 50),
-            "emerald": (0, 128, 0),
-            "ruby": (155, 17, 30),
-            "sapphire": (15, 82, 186),
-            "amethyst": (153, 102, 204),
-            "topaz": (255, 200, 124),
-            
-            # Special colors
-            "rainbow": self.get_rainbow_color(),
-            "neon": (0, 255, 255),
-            "pastel": (255, 182, 193),
-            "metallic": (169, 169, 169),
-            "glow": (255, 255, 224),
-            "sparkle": (255, 255, 255),
-            "shimmer": (240, 248, 255),
-            "crystal": (176, 196, 222),
-            
-            # Arrow colors
-            "electric": (0, 255, 255),
-            "fire": (255, 69, 0),
-            "ice": (173, 216, 230),
-            "earth": (139, 69, 19),
-            "wind": (240, 248, 255),
-            "light": (255, 255, 224),
-            "dark": (47, 79, 79),
-            "cosmic": (138, 43, 226),
-        }
-        
-        return color_map.get(color_name, (255, 255, 255))
+        if color_name == "rainbow":
+            return self.get_rainbow_color()
+        return COLOR_PALETTE.get(color_name, (255, 255, 255))
     
     def get_rainbow_color(self):
         """Get a random rainbow color."""
-        rainbow_colors = [
-            (255, 0, 0),    # Red
-            (255, 127, 0),  # Orange
-            (255, 255, 0),  # Yellow
-            (0, 255, 0),    # Green
-            (0, 0, 255),    # Blue
-            (75, 0, 130),   # Indigo
-            (148, 0, 211),  # Violet
-        ]
-        return random.choice(rainbow_colors)
+        return rng.choice(RAINBOW_COLORS)
+    
+    # Motion state, stored in the shape's row
+    x = store_field("x")
+    y = store_field("y")
+    prev_x = store_field("prev_x")
+    prev_y = store_field("prev_y")
+    velocity_x = store_field("velocity_x")
+    velocity_y = store_field("velocity_y")
+    angle = store_field("angle")
+    prev_angle = store_field("prev_angle")
+    rotation_speed = store_field("rotation_speed")
+    scale = store_field("scale")
+    prev_scale = store_field("prev_scale")
+    scale_speed = store_field("scale_speed")
+    
+    def release(self):
+        """Give the shape's row back to its store."""
+        self.store.release(self.row)
     
     def update(self):
-        """Update shape position and properties."""
+        """Advance this shape alone by one simulation step.
+        
+        ShapeManager steps every shape at once with ShapeStore.step.
+        """
+        self.prev_x = self.x
+        self.prev_y = self.y
+        self.prev_angle = self.angle
+        self.prev_scale = self.scale
+        
         self.x += self.velocity_x
         self.y += self.velocity_y
         self.angle += self.rotation_speed
@@ -100,16 +193,67 @@ class Shape:
         # Keep scale reasonable
         self.scale = max(0.1, min(3.0, self.scale))
     
-    def draw(self, screen):
-        """Draw the shape on the screen."""
+    def get_radius(self):
+        """Get the radius of the circle the shape roughly fills."""
+        # Sprites are 2 * size across, so larger scales are clipped
+        return self.size * min(self.scale, 1.0)
+    
+    def draw(self, screen, alpha=1.0):
+        """Draw the shape on the screen and return the rect it covers.
+        
+        alpha interpolates between the previous simulation step (0.0) and
+        the current one (1.0).
+        """
         if not self.visible:
-            return
+            return None
         
-        # Create a surface for the shape
-        surface = pygame.Surface((self.size * 2, self.size * 2), pygame.SRCALPHA)
+        x = self.prev_x + (self.x - self.prev_x) * alpha
+        y = self.prev_y + (self.y - self.prev_y) * alpha
+        angle = self.prev_angle + (self.angle - self.prev_angle) * alpha
+        scale = self.prev_scale + (self.scale - self.prev_scale) * alpha
+        return self.blit_sprite(screen, x, y, angle, scale)
+    
+    def blit_sprite(self, screen, x, y, angle, scale):
+        """Draw the shape's sprite centered at (x, y) and return the rect it covers."""
+        if isinstance(screen, TextureScreen):
+            # The renderer rotates and scales one full-size sprite; scales
+            # above 1 are capped, keeping the footprint hit testing uses
+            if self.shape_type in UNCACHEABLE_SHAPES:
+                # Redraw the shape's own surface and stream it to one texture
+                self.scratch_surface = self.render_sprite(1.0, self.scratch_surface)
+                return screen.draw_sprite(self.scratch_surface, (x, y), angle, min(scale, 1.0),
+                                          changing=True)
+            key = (self.shape_type, self.color, self.size, 1.0, self.pattern)
+            surface = sprite_cache.get(key, lambda: self.render_sprite(1.0))
+            return screen.draw_sprite(surface, (x, y), angle, min(scale, 1.0))
+        
+        if self.shape_type in UNCACHEABLE_SHAPES:
+            # Output changes every frame, so render and rotate it directly
+            surface = self.render_sprite(scale)
+            rotated_surface = pygame.transform.rotate(surface, angle)
+        else:
+            # Pick the pre-rotated frame from the sprite's rotation atlas
+            scale = sprite_cache.quantize_scale(scale)
+            key = (self.shape_type, self.color, self.size, scale, self.pattern)
+            rotated_surface = sprite_cache.get_rotated(
+                key, lambda: self.render_sprite(scale), angle)
+        
+        # Get the rect for positioning
+        rect = rotated_surface.get_rect(center=(x, y))
+        
+        # Draw to screen
+        return screen.blit(rotated_surface, rect)
+    
+    def render_sprite(self, scale, surface=None):
+        """Render the unrotated shape at the given scale, reusing surface if it fits."""
+        # Create a surface for the shape, or clear the one given
+        if surface is not None and surface.get_size() == (self.size * 2, self.size * 2):
+            surface.fill((0, 0, 0, 0))
+        else:
+            surface = pygame.Surface((self.size * 2, self.size * 2), pygame.SRCALPHA)
         
         # Apply transformations
-        scaled_size = int(self.size * self.scale)
+        scaled_size = int(self.size * scale)
         center_x, center_y = self.size, self.size
         
         # Draw based on shape type
@@ -186,35 +330,18 @@ class Shape:
             # Default to circle
             pygame.draw.circle(surface, self.color, (center_x, center_y), scaled_size)
         
-        # Rotate the surface
-        rotated_surface = pygame.transform.rotate(surface, self.angle)
-        
-        # Get the rect for positioning
-        rect = rotated_surface.get_rect(center=(self.x, self.y))
-        
-        # Draw to screen
-        screen.blit(rotated_surface, rect)
+        return surface
     
     def draw_star(self, surface, x, y, size):
         """Draw a star shape."""
-        points = []
-        for i in range(10):
-            angle = i * math.pi / 5
-            radius = size if i % 2 == 0 else max(1, size // 2)  # Ensure radius is never zero
-            points.append((x + radius * math.cos(angle), y + radius * math.sin(angle)))
-        pygame.draw.polygon(surface, self.color, points)
+        points = geometry.star_points(size) + (x, y)
+        pygame.draw.polygon(surface, self.color, points.tolist())
     
     def draw_heart(self, surface, x, y, size):
         """Draw a heart shape."""
-        points = []
         scale_factor = max(1, size // 16)  # Ensure scale factor is never zero
-        for t in range(0, 360, 5):
-            angle = math.radians(t)
-            px = 16 * math.sin(angle) ** 3
-            py = -(13 * math.cos(angle) - 5 * math.cos(2*angle) - 2 * math.cos(3*angle) - math.cos(4*angle))
-            points.append((x + px * scale_factor, y + py * scale_factor))
-        if len(points) > 2:
-            pygame.draw.polygon(surface, self.color, points)
+        points = geometry.transform(geometry.HEART, scale_factor, x, y)
+        pygame.draw.polygon(surface, self.color, points.tolist())
     
     def draw_cross(self, surface, x, y, size):
         """Draw a cross shape."""
@@ -224,13 +351,8 @@ class Shape:
     
     def draw_spiral(self, surface, x, y, size):
         """Draw a spiral shape."""
-        points = []
-        for i in range(0, 720, 10):
-            angle = math.radians(i)
-            radius = i / 720 * size
-            points.append((x + radius * math.cos(angle), y + radius * math.sin(angle)))
-        if len(points) > 1:
-            pygame.draw.lines(surface, self.color, False, points, 3)
+        points = geometry.transform(geometry.SPIRAL, size, x, y)
+        pygame.draw.lines(surface, self.color, False, points.tolist(), 3)
     
     def draw_wave(self, surface, x, y, size):
         """Draw a wave pattern."""
@@ -254,37 +376,32 @@ class Shape:
             pygame.draw.lines(surface, self.color, False, points, 3)
     
     def draw_dots(self, surface, x, y, size):
-        """Draw multiple dots."""
-        for i in range(5):
-            dot_x = x + random.randint(-size, size)
-            dot_y = y + random.randint(-size, size)
-            dot_radius = max(1, size // 5)  # Ensure radius is never zero
+        """Draw multiple dots in the shape's random layout."""
+        dot_radius = max(1, size // 5)  # Ensure radius is never zero
+        points = geometry.transform(geometry.scatter(self.pattern, 5), size, x, y)
+        for dot_x, dot_y in points.round().astype(int).tolist():
             pygame.draw.circle(surface, self.color, (dot_x, dot_y), dot_radius)
     
     def draw_lines(self, surface, x, y, size):
-        """Draw multiple lines."""
-        for i in range(3):
-            start_x = x + random.randint(-size, size)
-            start_y = y + random.randint(-size, size)
-            end_x = x + random.randint(-size, size)
-            end_y = y + random.randint(-size, size)
-            pygame.draw.line(surface, self.color, (start_x, start_y), (end_x, end_y), 3)
+        """Draw multiple lines in the shape's random layout."""
+        points = geometry.transform(geometry.scatter(self.pattern, 6), size, x, y)
+        points = points.round().astype(int).tolist()
+        for start, end in zip(points[0::2], points[1::2]):
+            pygame.draw.line(surface, self.color, start, end, 3)
+    
+    def draw_rays(self, surface, x, y, size, directions, width, color=None):
+        """Draw lines from the center out along unit directions."""
+        color = self.color if color is None else color
+        for end in geometry.transform(directions, size, x, y).tolist():
+            pygame.draw.line(surface, color, (x, y), end, width)
     
     def draw_fireworks(self, surface, x, y, size):
         """Draw fireworks effect."""
-        for i in range(8):
-            angle = i * math.pi / 4
-            end_x = x + size * math.cos(angle)
-            end_y = y + size * math.sin(angle)
-            pygame.draw.line(surface, self.color, (x, y), (end_x, end_y), 3)
+        self.draw_rays(surface, x, y, size, geometry.FIREWORK_RAYS, 3)
     
     def draw_sparkle(self, surface, x, y, size):
         """Draw a sparkle effect."""
-        for i in range(4):
-            angle = i * math.pi / 2
-            end_x = x + size * math.cos(angle)
-            end_y = y + size * math.sin(angle)
-            pygame.draw.line(surface, self.color, (x, y), (end_x, end_y), 2)
+        self.draw_rays(surface, x, y, size, geometry.SPARKLE_RAYS, 2)
     
     def draw_bubble(self, surface, x, y, size):
         """Draw a bubble with highlight."""
@@ -297,11 +414,9 @@ class Shape:
         """Draw a flower with petals."""
         petal_size = max(1, size // 3)  # Ensure petal size is never zero
         center_size = max(1, size // 4)  # Ensure center size is never zero
-        for i in range(6):
-            angle = i * math.pi / 3
-            petal_x = x + size//2 * math.cos(angle)
-            petal_y = y + size//2 * math.sin(angle)
-            pygame.draw.circle(surface, self.color, (int(petal_x), int(petal_y)), petal_size)
+        petals = geometry.transform(geometry.FLOWER_PETALS, size // 2, x, y)
+        for petal_x, petal_y in petals.astype(int).tolist():
+            pygame.draw.circle(surface, self.color, (petal_x, petal_y), petal_size)
         pygame.draw.circle(surface, (255, 255, 0), (x, y), center_size)
     
     def draw_butterfly(self, surface, x, y, size):
@@ -334,11 +449,7 @@ class Shape:
         """Draw a sun with rays."""
         pygame.draw.circle(surface, (255, 255, 0), (x, y), size)
         half_size = max(1, size // 2)  # Ensure half size is never zero
-        for i in range(8):
-            angle = i * math.pi / 4
-            ray_x = x + (size + half_size) * math.cos(angle)
-            ray_y = y + (size + half_size) * math.sin(angle)
-            pygame.draw.line(surface, (255, 255, 0), (x, y), (ray_x, ray_y), 3)
+        self.draw_rays(surface, x, y, size + half_size, geometry.SUN_RAYS, 3, (255, 255, 0))
     
     def draw_moon(self, surface, x, y, size):
         """Draw a crescent moon."""
@@ -356,19 +467,11 @@ class Shape:
     
     def draw_explosion(self, surface, x, y, size):
         """Draw an explosion effect."""
-        for i in range(12):
-            angle = i * math.pi / 6
-            end_x = x + size * math.cos(angle)
-            end_y = y + size * math.sin(angle)
-            pygame.draw.line(surface, self.color, (x, y), (end_x, end_y), 4)
+        self.draw_rays(surface, x, y, size, geometry.EXPLOSION_RAYS, 4)
     
     def draw_burst(self, surface, x, y, size):
         """Draw a burst pattern."""
-        for i in range(6):
-            angle = i * math.pi / 3
-            end_x = x + size * math.cos(angle)
-            end_y = y + size * math.sin(angle)
-            pygame.draw.line(surface, self.color, (x, y), (end_x, end_y), 5)
+        self.draw_rays(surface, x, y, size, geometry.BURST_RAYS, 5)
     
     def draw_fade(self, surface, x, y, size):
         """Draw a fade effect."""
@@ -386,7 +489,25 @@ class Shape:
         half_size = max(1, size // 2)  # Ensure half size is never zero
         sixth_size = max(1, size // 6)  # Ensure sixth size is never zero
         for i in range(4):
-            angle = i * math.pi / 2 + pygame.time.get_ticks() * 0.01
+            angle = i * math.pi / 2 + game_clock.get_ticks() * 0.01
             shimmer_x = x + half_size * math.cos(angle)
             shimmer_y = y + half_size * math.sin(angle)
-            pygame.draw.circle(surface, (255, 255, 255), (int(shimmer_x), int(shimmer_y)), sixth_size)
\ No newline at end of file
+            pygame.draw.circle(surface, (255, 255, 255), (int(shimmer_x), int(shimmer_y)), sixth_size)
+
+
+class ShapeSprite(Shape):
+    __slots__ = ()
+    
+    def __init__(self, shape_type, color, size, pattern):
+        """Initialize a sprite with only what drawing a shape needs.
+        
+        Simulation snapshots draw these, so the simulation thread can reset
+        pooled shapes without changing what is being drawn. They have no
+        store row and never move.
+        """
+        self.shape_type = shape_type
+        self.color = color
+        self.size = size
+        self.pattern = pattern
+        self.visible = True
+        self.scratch_surface = None
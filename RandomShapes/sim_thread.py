@@ -0,0 +1,197 @@
+"""
+Simulation Thread module for Baby Games
+Runs the fixed-step simulation on a worker thread while the main thread
+handles events and draws.
+
+The worker writes each new state into one of three snapshots and
+publishes it; the main thread draws the latest published one. Handing
+snapshots over only swaps buffer indices, so neither side ever waits
+for the other. Input reaches the simulation as commands on a queue,
+run by the worker between steps.
+"""
+
+import queue
+import threading
+import time
+import numpy as np
+from shapes import ShapeSprite
+from particle_system import ParticleSystem
+from animation_manager import AnimationManager
+
+# Shape store columns copied into a snapshot, as (previous, current) pairs
+MOTION_FIELDS = ("prev_x", "x", "prev_y", "y", "prev_angle", "angle", "prev_scale", "scale")
+
+
+class SimulationSnapshot:
+    def __init__(self, shape_manager, animation_manager):
+        """Initialize an empty snapshot.
+
+        Particles are copied into render-only particle systems that share
+        the live systems' renderers, so drawing a snapshot works just like
+        drawing the live state.
+        """
+        self.sprites = []  # ShapeSprite per drawn shape, in draw order
+        self.motion = np.zeros((len(MOTION_FIELDS), 64))
+        self.particles = ParticleSystem(capacity=shape_manager.particle_system.capacity)
+        self.particles.renderer = shape_manager.particle_system.renderer
+        self.effects = AnimationManager(capacity=animation_manager.capacity)
+        self.effects.renderer = animation_manager.renderer
+        self.step_time = time.perf_counter()  # When the last step in it was due
+
+    def write(self, shape_manager, animation_manager, sprites, step_time):
+        """Copy the simulation's drawable state into this snapshot."""
+        shapes = [shape for shape in shape_manager.shapes if shape.visible]
+        n = len(shapes)
+        if n > self.motion.shape[1]:
+            self.motion = np.zeros((len(MOTION_FIELDS), max(n, self.motion.shape[1] * 2)))
+
+        rows = np.fromiter((shape.row for shape in shapes), dtype=np.intp, count=n)
+        store = shape_manager.shape_store
+        for i, name in enumerate(MOTION_FIELDS):
+            np.take(getattr(store, name), rows, out=self.motion[i, :n])
+        self.sprites = [sprites(shape) for shape in shapes]
+
+        self.particles.copy_from(shape_manager.particle_system)
+        self.effects.copy_from(animation_manager)
+        self.step_time = step_time
+
+    def get_alpha(self, step_ms):
+        """Get how far the present is from the snapshot's last step to the next one."""
+        elapsed_ms = (time.perf_counter() - self.step_time) * 1000
+        return min(1.0, max(0.0, elapsed_ms / step_ms))
+
+    def draw(self, screen, alpha=1.0):
+        """Draw the snapshot's shapes and pop particles and return the rects they cover."""
+        n = len(self.sprites)
+        previous = self.motion[0::2, :n]
+        current = self.motion[1::2, :n]
+        xs, ys, angles, scales = (previous + (current - previous) * alpha).tolist()
+
+        rects = [sprite.blit_sprite(screen, x, y, angle, scale)
+                 for sprite, x, y, angle, scale in zip(self.sprites, xs, ys, angles, scales)]
+        rects.extend(self.particles.draw(screen, alpha))
+        return rects
+
+    def draw_particles(self, screen, alpha=1.0):
+        """Draw the snapshot's effect particles and return the rects they cover."""
+        return self.effects.draw_particles(screen, alpha)
+
+
+class SimulationThread:
+    def __init__(self, shape_manager, animation_manager, step, step_ms, max_steps):
+        """Initialize the simulation thread.
+
+        step advances the simulation by one step of step_ms milliseconds;
+        at most max_steps run back to back before the thread skips ahead.
+        """
+        self.shape_manager = shape_manager
+        self.animation_manager = animation_manager
+        self.step = step
+        self.step_ms = step_ms
+        self.max_steps = max_steps
+        self.commands = queue.SimpleQueue()
+        self.sprites = {}  # (type, color, size, pattern) -> ShapeSprite
+        self.stop_event = threading.Event()
+        self.error = None
+        self.thread = None
+
+        # Three snapshots: one being drawn, one being written and the latest
+        # published one. Only the worker writes latest and back; only the
+        # main thread writes front.
+        self.snapshots = [SimulationSnapshot(shape_manager, animation_manager) for _ in range(3)]
+        self.snapshots[0].write(shape_manager, animation_manager, self.get_sprite,
+                                time.perf_counter())
+        self.latest = 0
+        self.front = 0
+        self.back = 1
+
+        # Statistics
+        self.steps = 0
+        self.published = 0
+
+    def start(self):
+        """Start stepping the simulation in the background."""
+        self.thread = threading.Thread(target=self.run, name="simulation", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Stop the thread and wait for it to finish its current step."""
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def submit(self, command, *args):
+        """Queue a command to run on the simulation thread before its next step."""
+        self.commands.put((command, args))
+
+    def get_sprite(self, shape):
+        """Get the shared, unchanging sprite for a shape's current looks."""
+        key = (shape.shape_type, shape.color, shape.size, shape.pattern)
+        sprite = self.sprites.get(key)
+        if sprite is None:
+            sprite = self.sprites[key] = ShapeSprite(*key)
+        return sprite
+
+    def acquire_front(self):
+        """Get the latest published snapshot and keep the worker from reusing it."""
+        if self.error is not None:
+            raise RuntimeError("Simulation thread stopped") from self.error
+        while True:
+            index = self.latest
+            self.front = index
+            # If a newer snapshot was published meanwhile, the worker may
+            # have picked this one to write next; take the newer one
+            if self.latest == index:
+                return self.snapshots[index]
+
+    def publish(self, step_time):
+        """Write the current state into the back snapshot and make it the latest."""
+        self.snapshots[self.back].write(self.shape_manager, self.animation_manager,
+                                        self.get_sprite, step_time)
+        self.latest = self.back
+        self.back = ({0, 1, 2} - {self.latest, self.front}).pop()
+        self.published += 1
+
+    def run_commands(self):
+        """Run every queued command."""
+        while True:
+            try:
+                command, args = self.commands.get_nowait()
+            except queue.Empty:
+                return
+            command(*args)
+
+    def run(self):
+        """Step the simulation in real time until stopped."""
+        step_seconds = self.step_ms / 1000
+        next_step = time.perf_counter()
+        try:
+            while not self.stop_event.is_set():
+                self.run_commands()
+
+                steps = 0
+                now = time.perf_counter()
+                while next_step <= now and steps < self.max_steps:
+                    self.step()
+                    next_step += step_seconds
+                    steps += 1
+                if next_step <= now:
+                    # Too far behind (e.g. after a stall); skip ahead rather than spiral
+                    next_step = now + step_seconds
+                self.steps += steps
+                if steps:
+                    self.publish(next_step - step_seconds)
+
+                self.stop_event.wait(max(0.0, next_step - time.perf_counter()))
+        except Exception as e:
+            self.error = e
+
+    def get_stats(self):
+        """Get step and publish counts."""
+        return {
+            'steps': self.steps,
+            'published': self.published,
+            'queued_commands': self.commands.qsize(),
+            'sprites': len(self.sprites),
+        }
@@ -4,197 +4,172 @@ Handles baby-friendly sounds for shape generation and interactions.
 """
 
 import random
+import threading
+import time
 import pygame
-import math
+import numpy as np
+from audio_cache import AudioCache
+from game_log import logger
+from voice_pool import VoicePool
+
+# Mixer format: sample rate, signed 16-bit samples, stereo
+MIXER_FREQUENCY = 22050
+MIXER_SIZE = -16
+MIXER_CHANNELS = 2
+
+# Baby-friendly tones. Each harmonic is (frequency multiple, weight); the
+# envelope is amplitude * exp(-t / decay). phase_jitter adds random phase
+# noise of up to that many radians per sample.
+TONES = {
+    'bell': {'frequency': 523, 'amplitude': 0.6, 'decay': 0.8, 'harmonics': ((1, 0.6), (2, 0.3), (3, 0.1))},  # C5
+    'chime': {'frequency': 659, 'amplitude': 0.5, 'decay': 1.0},  # E5
+    'tinkle': {'frequency': 784, 'amplitude': 0.4, 'decay': 0.6},  # G5
+    'pop': {'frequency': 440, 'amplitude': 0.7, 'decay': 0.4},  # A4
+    'sparkle': {'frequency': 587, 'amplitude': 0.5, 'decay': 0.7, 'phase_jitter': 0.05},  # D5
+}
+
+
+def synthesize_tone(tone, sample_rate, duration, channels=2, rng=None):
+    """Synthesize a tone as an int16 array shaped for pygame.sndarray."""
+    t = np.arange(int(sample_rate * duration)) / sample_rate
+    
+    phase = 2 * np.pi * tone['frequency'] * t
+    if tone.get('phase_jitter'):
+        rng = rng if rng is not None else np.random.default_rng()
+        phase = phase + rng.uniform(0, tone['phase_jitter'], len(t))
+    
+    # Sum the harmonics, then apply the decay envelope
+    wave = np.zeros(len(t))
+    for multiple, weight in tone.get('harmonics', ((1, 1.0),)):
+        wave += weight * np.sin(multiple * phase)
+    wave *= tone['amplitude'] * np.exp(-t / tone['decay'])
+    
+    # Convert to 16-bit integers, copied to every channel
+    samples = (wave * 32767).astype(np.int16)
+    if channels == 1:
+        return samples
+    return np.ascontiguousarray(np.repeat(samples[:, None], channels, axis=1))
 
 
 class SoundManager:
-    def __init__(self):
-        """Initialize the sound manager with baby-friendly sounds."""
+    def __init__(self, use_cache=True, cache_dir=None, background=True,
+                 frequency=MIXER_FREQUENCY, buffer=512, max_voices=8, max_triggers_per_frame=2):
+        """Initialize the sound manager with baby-friendly sounds.
+        
+        With background=True the sounds are prepared on a worker thread and
+        become playable one by one as they finish. buffer is the mixer
+        buffer size in samples (smaller means lower latency), and
+        max_voices / max_triggers_per_frame configure the voice pool.
+        """
         self.sounds = {}
         self.sound_enabled = True
+        self.voice_pool = None
+        self.rng = np.random.default_rng()
+        self.audio_cache = AudioCache(cache_dir) if use_cache else None
         self.volume = 0.9  # Increased volume for better audibility
         
+        # Startup timing breakdown, in seconds
+        self.startup_timings = {}
+        self.ready_event = threading.Event()
+        self.worker = None
+        
         # Initialize pygame mixer
+        start = time.perf_counter()
+        requested = (frequency, MIXER_SIZE, MIXER_CHANNELS)
         try:
-            pygame.mixer.init(frequency=22050, size=-16, channels=2, buffer=512)
+            if pygame.mixer.get_init() not in (None, requested):
+                # pygame.init() opened the mixer with its own defaults, which
+                # mixer.init() would keep; reopen it with these settings
+                pygame.mixer.quit()
+            pygame.mixer.init(frequency=frequency, size=MIXER_SIZE, channels=MIXER_CHANNELS,
+                              buffer=buffer)
         except pygame.error:
-            print("⚠️  Could not initialize audio system. Sounds will be disabled.")
+            logger.warning("⚠️  Could not initialize audio system. Sounds will be disabled.")
             self.sound_enabled = False
+            self.ready_event.set()
             return
+        if pygame.mixer.get_init() != requested:
+            logger.warning("⚠️  Audio device opened as %s instead of %s", pygame.mixer.get_init(), requested)
+        self.voice_pool = VoicePool(max_voices, max_triggers_per_frame)
+        self.startup_timings['mixer_init'] = time.perf_counter() - start
         
         # Create simple baby-friendly sounds
-        self._create_baby_sounds()
+        if background:
+            self.worker = threading.Thread(target=self._create_baby_sounds,
+                                           name="sound-preparation", daemon=True)
+            self.worker.start()
+        else:
+            self._create_baby_sounds()
     
     def _create_baby_sounds(self):
         """Create simple, pleasant sounds suitable for babies."""
         if not self.sound_enabled:
+            self.ready_event.set()
             return
-            
-        # Generate different types of baby-friendly sounds
-        sample_rate = 22050
-        duration = 1.0  # Longer duration for piano-like notes
-        
-        # 1. Gentle bell-like sound
-        bell_sound = self._generate_bell_sound(sample_rate, duration)
-        self.sounds['bell'] = bell_sound
-        
-        # 2. Soft chime sound
-        chime_sound = self._generate_chime_sound(sample_rate, duration)
-        self.sounds['chime'] = chime_sound
-        
-        # 3. Gentle tinkle sound
-        tinkle_sound = self._generate_tinkle_sound(sample_rate, duration)
-        self.sounds['tinkle'] = tinkle_sound
-        
-        # 4. Soft pop sound
-        pop_sound = self._generate_pop_sound(sample_rate, duration)
-        self.sounds['pop'] = pop_sound
-        
-        # 5. Gentle sparkle sound
-        sparkle_sound = self._generate_sparkle_sound(sample_rate, duration)
-        self.sounds['sparkle'] = sparkle_sound
-    
-    def _generate_bell_sound(self, sample_rate, duration):
-        """Generate a gentle bell-like sound."""
-        samples = int(sample_rate * duration)
-        sound_data = []
-        
-        for i in range(samples):
-            # Create a gentle bell-like tone with harmonics
-            t = i / sample_rate
-            freq = 523  # C5 note
-            amplitude = 0.6 * math.exp(-t / 0.8)  # Slower decay for piano-like sustain
-            
-            # Add harmonics for a richer sound
-            wave = (amplitude * 
-                   (0.6 * math.sin(2 * math.pi * freq * t) +
-                    0.3 * math.sin(2 * math.pi * freq * 2 * t) +
-                    0.1 * math.sin(2 * math.pi * freq * 3 * t)))
-            
-            # Convert to 16-bit integer
-            sample = int(wave * 32767)
-            sound_data.extend([sample, sample])  # Stereo
         
-        # Create a simple sound using pygame's built-in capabilities
-        return self._create_sound_from_data(sound_data)
-    
-    def _generate_chime_sound(self, sample_rate, duration):
-        """Generate a soft chime sound."""
-        samples = int(sample_rate * duration)
-        sound_data = []
-        
-        for i in range(samples):
-            t = i / sample_rate
-            freq = 659  # E5 note
-            amplitude = 0.5 * math.exp(-t / 1.0)  # Even slower decay
-            
-            wave = amplitude * math.sin(2 * math.pi * freq * t)
-            sample = int(wave * 32767)
-            sound_data.extend([sample, sample])
-        
-        return self._create_sound_from_data(sound_data)
-    
-    def _generate_tinkle_sound(self, sample_rate, duration):
-        """Generate a gentle tinkle sound."""
-        samples = int(sample_rate * duration)
-        sound_data = []
-        
-        for i in range(samples):
-            t = i / sample_rate
-            freq = 784  # G5 note
-            amplitude = 0.4 * math.exp(-t / 0.6)  # Medium decay
+        try:
+            # Synthesize for the format the mixer actually opened with
+            mixer_format = pygame.mixer.get_init()
+            sample_rate, _, channels = mixer_format
+            duration = 1.0  # Longer duration for piano-like notes
             
-            wave = amplitude * math.sin(2 * math.pi * freq * t)
-            sample = int(wave * 32767)
-            sound_data.extend([sample, sample])
-        
-        return self._create_sound_from_data(sound_data)
+            all_start = time.perf_counter()
+            for name, tone in TONES.items():
+                start = time.perf_counter()
+                samples = None
+                if self.audio_cache is not None:
+                    key = self.audio_cache.make_key(tone, sample_rate, duration, mixer_format)
+                    samples = self.audio_cache.load(name, key, channels)
+                source = 'cache'
+                
+                if samples is None:
+                    source = 'synthesized'
+                    samples = synthesize_tone(tone, sample_rate, duration, channels, self.rng)
+                    if self.audio_cache is not None:
+                        self.audio_cache.store(name, key, samples)
+                
+                self.sounds[name] = pygame.sndarray.make_sound(samples)
+                self.startup_timings[f'sound_{name}_{source}'] = time.perf_counter() - start
+            self.startup_timings['sounds_total'] = time.perf_counter() - all_start
+        except pygame.error as e:
+            logger.warning("⚠️  Could not prepare sounds: %s", e)
+        finally:
+            self.ready_event.set()
     
-    def _generate_pop_sound(self, sample_rate, duration):
-        """Generate a soft pop sound."""
-        samples = int(sample_rate * duration)
-        sound_data = []
-        
-        for i in range(samples):
-            t = i / sample_rate
-            freq = 440  # A4 note
-            amplitude = 0.7 * math.exp(-t / 0.4)  # Quick attack, medium decay
-            
-            wave = amplitude * math.sin(2 * math.pi * freq * t)
-            sample = int(wave * 32767)
-            sound_data.extend([sample, sample])
-        
-        return self._create_sound_from_data(sound_data)
+    def is_ready(self):
+        """Check whether every sound has finished preparing."""
+        return self.ready_event.is_set()
     
-    def _generate_sparkle_sound(self, sample_rate, duration):
-        """Generate a gentle sparkle sound."""
-        samples = int(sample_rate * duration)
-        sound_data = []
-        
-        for i in range(samples):
-            t = i / sample_rate
-            freq = 587  # D5 note
-            amplitude = 0.5 * math.exp(-t / 0.7)  # Balanced decay
-            
-            # Add some randomness for sparkle effect
-            wave = amplitude * math.sin(2 * math.pi * freq * t + random.uniform(0, 0.05))
-            sample = int(wave * 32767)
-            sound_data.extend([sample, sample])
-        
-        return self._create_sound_from_data(sound_data)
+    def wait_until_ready(self, timeout=None):
+        """Block until every sound is prepared; returns False on timeout."""
+        return self.ready_event.wait(timeout)
     
-    def _create_sound_from_data(self, sound_data):
-        """Create a pygame sound from raw audio data."""
-        try:
-            # Try to use numpy if available for better performance
-            import numpy as np
-            sound_array = np.array(sound_data, dtype=np.int16)
-            stereo_array = sound_array.reshape(-1, 2)
-            return pygame.sndarray.make_sound(stereo_array)
-        except ImportError:
-            # Fallback to simple approach without numpy
-            # Create a simple beep sound as fallback
-            return self._create_simple_beep()
+    def get_ready_sound_names(self):
+        """Get the names of the sounds that can be played right now."""
+        return list(self.sounds.keys())
     
-    def _create_simple_beep(self):
-        """Create a simple beep sound as fallback."""
-        try:
-            # Create a simple sine wave sound
-            sample_rate = 22050
-            duration = 0.2
-            samples = int(sample_rate * duration)
-            sound_data = []
-            
-            for i in range(samples):
-                t = i / sample_rate
-                freq = 800
-                amplitude = 0.2 * (1 - t / duration)
-                wave = amplitude * math.sin(2 * math.pi * freq * t)
-                sample = int(wave * 32767)
-                sound_data.extend([sample, sample])
-            
-            # Convert to pygame sound
-            sound_array = pygame.surfarray.pixels3d(
-                pygame.Surface((len(sound_data) // 2, 1, 3)))[:, 0, 0].astype(pygame.int16)
-            return pygame.sndarray.make_sound(sound_array)
-        except:
-            # If all else fails, return None (sound will be disabled)
-            return None
+    def begin_frame(self):
+        """Start a new frame for sound trigger rate limiting."""
+        if self.voice_pool is not None:
+            self.voice_pool.begin_frame()
     
-    def play_shape_sound(self):
-        """Play a random baby-friendly sound when a shape is created."""
-        if not self.sound_enabled or not self.sounds:
+    def play_shape_sound(self, pan=0.5):
+        """Play a random baby-friendly sound when a shape is created.
+        
+        pan places the sound between the left (0.0) and right (1.0) speaker.
+        """
+        # Sounds still being prepared are skipped
+        ready_sounds = self.get_ready_sound_names()
+        if not self.sound_enabled or not ready_sounds:
             return
         
         # Choose a random sound
-        sound_name = random.choice(list(self.sounds.keys()))
+        sound_name = random.choice(ready_sounds)
         sound = self.sounds[sound_name]
         
         if sound is not None:
-            # Set volume and play
-            sound.set_volume(self.volume)
-            sound.play()
+            # Play through the voice pool, panned to the shape's position
+            self.voice_pool.play(sound, self.volume, pan)
     
     def set_volume(self, volume):
         """Set the volume level (0.0 to 1.0)."""
@@ -207,5 +182,8 @@ class SoundManager:
     
     def cleanup(self):
         """Clean up sound resources."""
+        # Let the worker finish before the mixer goes away under it
+        if self.worker is not None:
+            self.worker.join(timeout=2.0)
         if self.sound_enabled:
             pygame.mixer.quit()
\ No newline at end of file
@@ -0,0 +1,164 @@
+"""
+Spatial Hash module for Baby Games
+Uniform grid index for finding nearby shapes without checking every pair.
+"""
+
+import numpy as np
+
+
+class SpatialHash:
+    def __init__(self, cell_size=128):
+        """Initialize the spatial hash.
+
+        Each item is a circle stored in every grid cell its bounding box
+        touches. Moving an item only touches the grid when it crosses into
+        different cells, so keeping the index current is cheap.
+        """
+        self.cell_size = cell_size
+        self.cells = {}    # (cell x, cell y) -> items in that cell
+        self.entries = {}  # item -> (x, y, radius, cell range)
+
+    def _cell_range(self, x, y, radius):
+        """Get the first and last cell columns and rows a circle touches."""
+        size = self.cell_size
+        return (int((x - radius) // size), int((y - radius) // size),
+                int((x + radius) // size), int((y + radius) // size))
+
+    def _add_to_cells(self, item, cell_range):
+        """Add an item to every cell in a range."""
+        left, top, right, bottom = cell_range
+        cells = self.cells
+        for cx in range(left, right + 1):
+            for cy in range(top, bottom + 1):
+                cell = cells.get((cx, cy))
+                if cell is None:
+                    cells[(cx, cy)] = [item]
+                else:
+                    cell.append(item)
+
+    def _remove_from_cells(self, item, cell_range):
+        """Remove an item from every cell in a range."""
+        left, top, right, bottom = cell_range
+        cells = self.cells
+        for cx in range(left, right + 1):
+            for cy in range(top, bottom + 1):
+                cell = cells[(cx, cy)]
+                cell.remove(item)
+                if not cell:
+                    del cells[(cx, cy)]
+
+    def insert(self, item, x, y, radius):
+        """Add an item, or move it if it is already indexed."""
+        if item in self.entries:
+            self.update(item, x, y, radius)
+            return
+        cell_range = self._cell_range(x, y, radius)
+        self.entries[item] = (x, y, radius, cell_range)
+        self._add_to_cells(item, cell_range)
+
+    def update(self, item, x, y, radius):
+        """Move an item, adding it if it isn't indexed yet."""
+        entry = self.entries.get(item)
+        if entry is None:
+            self.insert(item, x, y, radius)
+            return
+
+        cell_range = self._cell_range(x, y, radius)
+        if cell_range != entry[3]:
+            self._remove_from_cells(item, entry[3])
+            self._add_to_cells(item, cell_range)
+        self.entries[item] = (x, y, radius, cell_range)
+
+    def update_many(self, items, xs, ys, radii):
+        """Move or add many items at once from arrays of positions and radii."""
+        xs = np.asarray(xs, dtype=float)
+        ys = np.asarray(ys, dtype=float)
+        radii = np.asarray(radii, dtype=float)
+
+        # Work out every cell range in one go
+        size = self.cell_size
+        cell_ranges = zip(((xs - radii) // size).astype(int).tolist(),
+                          ((ys - radii) // size).astype(int).tolist(),
+                          ((xs + radii) // size).astype(int).tolist(),
+                          ((ys + radii) // size).astype(int).tolist())
+
+        entries = self.entries
+        for item, x, y, radius, cell_range in zip(items, xs.tolist(), ys.tolist(),
+                                                  radii.tolist(), cell_ranges):
+            entry = entries.get(item)
+            if entry is None:
+                self._add_to_cells(item, cell_range)
+            elif cell_range != entry[3]:
+                self._remove_from_cells(item, entry[3])
+                self._add_to_cells(item, cell_range)
+            entries[item] = (x, y, radius, cell_range)
+
+    def remove(self, item):
+        """Remove an item if it is indexed."""
+        entry = self.entries.pop(item, None)
+        if entry is not None:
+            self._remove_from_cells(item, entry[3])
+
+    def query_point(self, x, y):
+        """Get the items whose circles contain a point."""
+        size = self.cell_size
+        cell = self.cells.get((int(x // size), int(y // size)), ())
+        hits = []
+        for item in cell:
+            ix, iy, radius, _ = self.entries[item]
+            if (ix - x) ** 2 + (iy - y) ** 2 <= radius * radius:
+                hits.append(item)
+        return hits
+
+    def query_circle(self, x, y, radius):
+        """Get the items whose circles overlap a circle."""
+        left, top, right, bottom = self._cell_range(x, y, radius)
+        seen = set()
+        hits = []
+        for cx in range(left, right + 1):
+            for cy in range(top, bottom + 1):
+                for item in self.cells.get((cx, cy), ()):
+                    if item in seen:
+                        continue
+                    seen.add(item)
+                    ix, iy, item_radius, _ = self.entries[item]
+                    reach = radius + item_radius
+                    if (ix - x) ** 2 + (iy - y) ** 2 <= reach * reach:
+                        hits.append(item)
+        return hits
+
+    def overlapping_pairs(self):
+        """Get each pair of items whose circles overlap, once."""
+        entries = self.entries
+        seen = set()
+        pairs = []
+        for cell in self.cells.values():
+            n = len(cell)
+            for i in range(n - 1):
+                a = cell[i]
+                ax, ay, a_radius, _ = entries[a]
+                for j in range(i + 1, n):
+                    b = cell[j]
+                    bx, by, b_radius, _ = entries[b]
+                    reach = a_radius + b_radius
+                    if (bx - ax) ** 2 + (by - ay) ** 2 > reach * reach:
+                        continue
+                    # Large items share several cells with their neighbors
+                    key = (id(a), id(b)) if id(a) < id(b) else (id(b), id(a))
+                    if key not in seen:
+                        seen.add(key)
+                        pairs.append((a, b))
+        return pairs
+
+    def clear(self):
+        """Remove every item."""
+        self.cells.clear()
+        self.entries.clear()
+
+    def get_stats(self):
+        """Get index statistics."""
+        return {
+            'items': len(self.entries),
+            'cells': len(self.cells),
+            'max_items_per_cell': max((len(cell) for cell in self.cells.values()), default=0),
+        }
@@ -0,0 +1,131 @@
+"""
+Sprite Cache module for Baby Games
+Keeps pre-rendered shape sprites so identical shapes are only drawn once.
+"""
+
+from collections import OrderedDict
+import pygame
+
+# A sprite is 2 * size pixels across at 4 bytes a pixel, whatever its scale,
+# and a rotated frame is up to twice that area (up to ~310 KB for a 100
+# pixel shape). A full atlas for one shape is rotation_steps frames for
+# each scale bucket it passes through, up to MAX_SCALE / scale_step of them:
+# a key shape growing through ~19 buckets needs 64 * 19 * ~100 KB = ~120 MB,
+# so no default budget holds every frame of ten shapes. It holds the frames
+# in recent use instead. Shapes that grow and spin keep reaching new
+# frames, so most misses are first uses and evictions mostly drop frames
+# that are not shown again (steady_typing's hit rate is the same with no
+# limit, where the cache grows to ~375 MB).
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+class SpriteCache:
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, scale_step=0.05, rotation_steps=64):
+        """Initialize the sprite cache.
+
+        max_bytes bounds the pixel memory held by cached surfaces and
+        scale_step is the width of one scale bucket. rotation_steps is the
+        number of pre-rendered angles per sprite (0 rotates every frame).
+        """
+        self.max_bytes = max_bytes
+        self.scale_step = scale_step
+        self.rotation_steps = rotation_steps
+        self.entries = OrderedDict()  # key -> surface, oldest first
+        self.memory_bytes = 0
+
+        # Statistics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def quantize_scale(self, scale):
+        """Round a scale value to the nearest multiple of scale_step (at least one step)."""
+        bucket = max(1, round(scale / self.scale_step))
+        return bucket * self.scale_step
+
+    def get(self, key, render):
+        """Return the sprite for key, calling render() to create it on a miss."""
+        surface = self.entries.get(key)
+        if surface is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return surface
+
+        self.misses += 1
+        surface = render()
+        self.put(key, surface)
+        return surface
+
+    def get_rotated(self, key, render, angle):
+        """Return the sprite for key rotated by angle degrees.
+
+        With a rotation atlas the angle snaps to the nearest of
+        rotation_steps frames, each rendered the first time it is needed.
+        """
+        if not self.rotation_steps:
+            return pygame.transform.rotate(self.get(key, render), angle)
+
+        step = round((angle % 360) * self.rotation_steps / 360) % self.rotation_steps
+        if step == 0:
+            return self.get(key, render)
+
+        frame_angle = step * 360 / self.rotation_steps
+        return self.get((key, step),
+                        lambda: pygame.transform.rotate(self.get(key, render), frame_angle))
+
+    def put(self, key, surface):
+        """Store a sprite, evicting the least recently used ones if needed."""
+        old_surface = self.entries.pop(key, None)
+        if old_surface is not None:
+            self.memory_bytes -= self.surface_bytes(old_surface)
+
+        self.entries[key] = surface
+        self.memory_bytes += self.surface_bytes(surface)
+
+        # Always keep the newest sprite, even if it alone exceeds the budget
+        while self.memory_bytes > self.max_bytes and len(self.entries) > 1:
+            _, evicted = self.entries.popitem(last=False)
+            self.memory_bytes -= self.surface_bytes(evicted)
+            self.evictions += 1
+
+    def surface_bytes(self, surface):
+        """Get the pixel memory used by a surface."""
+        width, height = surface.get_size()
+        return width * height * surface.get_bytesize()
+
+    def set_scale_step(self, scale_step):
+        """Change the scale bucket width, dropping sprites made with the old one."""
+        if scale_step != self.scale_step:
+            self.scale_step = scale_step
+            self.clear()
+
+    def set_rotation_steps(self, rotation_steps):
+        """Change the rotation atlas resolution (0 disables the atlas)."""
+        if rotation_steps != self.rotation_steps:
+            self.rotation_steps = rotation_steps
+            self.clear()
+
+    def get_stats(self):
+        """Get cache statistics."""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self.entries),
+            'memory_bytes': self.memory_bytes,
+            'max_bytes': self.max_bytes,
+            'rotation_steps': self.rotation_steps,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+    def clear(self):
+        """Drop all cached sprites."""
+        self.entries.clear()
+        self.memory_bytes = 0
+
+    def reset_stats(self):
+        """Zero the hit, miss and eviction counts."""
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
@@ -5,12 +5,16 @@ Test script for shape limit and popping animation
 
 import pygame
 import sys
+import logging
+import game_clock
+import game_log
 from shape_manager import ShapeManager
 from display import Display
 
 def test_shape_limit():
     """Test the shape limit functionality."""
     pygame.init()
+    game_log.setup(logging.DEBUG)
     
     # Create display and shape manager
     display = Display()
@@ -57,11 +61,13 @@ def test_shape_limit():
             if particle_count > 0:
                 print(f"🎨 Shapes: {shape_count}, ✨ Particles: {particle_count}")
             
-            clock.tick(60)
+            game_log.end_frame()
+            game_clock.advance(clock.tick(60))
             
     finally:
         shape_manager.cleanup()
         pygame.quit()
+        game_log.shutdown()
     
     print("✅ Test completed!")
 
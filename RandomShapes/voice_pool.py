@@ -0,0 +1,80 @@
+"""
+Voice Pool module for Baby Games
+Manages mixer channels so key-mashing can't pile up unlimited sounds.
+"""
+
+import math
+import pygame
+
+
+class VoicePool:
+    def __init__(self, max_voices=8, max_triggers_per_frame=2):
+        """Initialize the voice pool.
+
+        At most max_voices sounds play at once; when all are busy the oldest
+        voice is stolen. Triggers beyond max_triggers_per_frame in a single
+        frame are coalesced into the ones already started.
+        """
+        self.max_voices = max_voices
+        self.max_triggers_per_frame = max_triggers_per_frame
+
+        pygame.mixer.set_num_channels(max_voices)
+        self.channels = [pygame.mixer.Channel(i) for i in range(max_voices)]
+        self.start_order = [0] * max_voices  # Trigger number each voice started at
+        self.trigger_count = 0
+        self.triggers_this_frame = 0
+
+        # Statistics
+        self.played = 0
+        self.stolen = 0
+        self.coalesced = 0
+
+    def begin_frame(self):
+        """Start a new frame for trigger rate limiting."""
+        self.triggers_this_frame = 0
+
+    def play(self, sound, volume=1.0, pan=0.5):
+        """Play a sound panned between left (0.0) and right (1.0).
+
+        Returns the channel used, or None if the trigger was coalesced.
+        """
+        if self.triggers_this_frame >= self.max_triggers_per_frame:
+            self.coalesced += 1
+            return None
+        self.triggers_this_frame += 1
+
+        # Use a free voice, or steal the one that started longest ago
+        index = next((i for i, channel in enumerate(self.channels) if not channel.get_busy()), None)
+        if index is None:
+            index = min(range(self.max_voices), key=lambda i: self.start_order[i])
+            self.stolen += 1
+
+        self.trigger_count += 1
+        self.start_order[index] = self.trigger_count
+        self.played += 1
+
+        # Channel.play resets the channel volume, so pan afterwards
+        channel = self.channels[index]
+        channel.play(sound)
+        left, right = self.pan_gains(pan)
+        channel.set_volume(volume * left, volume * right)
+        return channel
+
+    def pan_gains(self, pan):
+        """Get equal-power left/right gains for a pan position."""
+        pan = max(0.0, min(1.0, pan))
+        return math.cos(pan * math.pi / 2), math.sin(pan * math.pi / 2)
+
+    def get_active_voice_count(self):
+        """Get the number of voices currently playing."""
+        return sum(1 for channel in self.channels if channel.get_busy())
+
+    def get_stats(self):
+        """Get voice pool statistics."""
+        return {
+            'max_voices': self.max_voices,
+            'active_voices': self.get_active_voice_count(),
+            'played': self.played,
+            'stolen': self.stolen,
+            'coalesced': self.coalesced,
+        }